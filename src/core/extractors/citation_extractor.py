@@ -1,121 +1,134 @@
 """Extract and process citations from academic text."""
 
 import re
-from typing import List, Set
+from functools import lru_cache
+from typing import List, Optional, Set
 
+from src.core.extractors.document_index import DocumentIndex
 from src.core.metadata.models import Citation, Reference
 from src.utils.constants import CONTEXT_WINDOW
 
+try:
+    # google-re2 scans in linear time without Python-level backtracking
+    import re2 as scan_re
+except ImportError:
+    scan_re = re
+
+
+# Numeric citation patterns
+NUMERIC_CITATION_PATTERNS = {
+    # [1] or [1,2] or [1, 2] or [1 2]
+    "num_bracket": r"\[\d+(?:[,\s]+\d+)*\]",
+    # (1) or (1,2) or (1, 2) or (1 2)
+    "num_paren": r"\(\d+(?:[,\s]+\d+)*\)",
+}
+
+# Author-year patterns
+AUTHOR_YEAR_PATTERNS = {
+    # Smith et al. (2023)
+    "author_inline": r"[A-Z][a-z]+(?:\s+et\s+al\.)?\s*\(\d{4}[a-z]?\)",
+    # (Smith et al., 2023)
+    "author_paren": r"\([A-Z][a-z]+(?:\s+et\s+al\.)?,\s*\d{4}[a-z]?\)",
+}
+
+# Single alternation so the text is scanned once; match.lastgroup names the style
+CITATION_PATTERN = scan_re.compile(
+    "|".join(
+        f"(?P<{name}>{pattern})" for name, pattern in {**NUMERIC_CITATION_PATTERNS, **AUTHOR_YEAR_PATTERNS}.items()
+    )
+)
+NUMERIC_GROUPS = frozenset(NUMERIC_CITATION_PATTERNS)
+
+# Helper patterns for normalization
+# Numeric citation bodies hold only digits and separators, so every
+# maximal digit run is a token; four or more digits is a year or page
+REF_NUMBER_PATTERN = re.compile(r"(?<!\d)\d{1,3}(?!\d)")
+DIGITS_PATTERN = re.compile(r"\d+")
+# Drop parentheses and commas; the only "." in an author-year match is "et al."
+AUTHOR_TABLE = str.maketrans(".", " ", "(),")
+
+
+@lru_cache(maxsize=4096)
+def _reference_match_key(family: Optional[str], full_name: str, year: Optional[int]) -> str:
+    """Build the author_year key for a reference; cached across documents sharing a library."""
+    # Get first author's family name
+    first_author = family or full_name.split()[-1]
+
+    # Add year if available
+    if year:
+        return f"{first_author.lower()}_{year}"
+
+    return first_author.lower()
+
 
 class CitationExtractor:
     """Extracts citations from academic text."""
 
-    def __init__(self):
-        # Numeric citation patterns
-        self.numeric_patterns = [
-            # [1] or [1,2] or [1, 2] or [1 2]
-            r"\[(\d+(?:[,\s]+\d+)*)\]",
-            # (1) or (1,2) or (1, 2) or (1 2)
-            r"\((\d+(?:[,\s]+\d+)*)\)",
-        ]
-
-        # Author-year patterns
-        self.author_patterns = [
-            # Smith et al. (2023)
-            r"([A-Z][a-z]+(?:\s+et\s+al\.)?)\s*\((\d{4}[a-z]?)\)",
-            # (Smith et al., 2023)
-            r"\(([A-Z][a-z]+(?:\s+et\s+al\.)?),\s*(\d{4}[a-z]?)\)",
-        ]
-
-        # Patterns to identify equation contexts
-        self.equation_markers = [
-            r"\$\$.*?\$\$",  # Display math $$...$$
-            r"\$.*?\$",  # Inline math $...$
-            r"\\begin\{equation\}.*?\\end\{equation\}",
-            r"\\begin\{align\*?\}.*?\\end\{align\*?\}",
-        ]
-
-    def extract_citations(self, text: str) -> List[Citation]:
-        """Extract citations from text."""
+    # Preformatted IDs for the three-digit reference numbers numeric citations can carry
+    _REF_IDS = {str(i): f"ref_{i}" for i in range(1000)}
+
+    def extract_citations(self, text: str, index: Optional[DocumentIndex] = None) -> List[Citation]:
+        """Extract citations from text, reusing a pre-built document index if given."""
         citations = []
 
-        # Extract numeric citations
-        for pattern in self.numeric_patterns:
-            for match in re.finditer(pattern, text):
-                # Skip if within equation
-                if self._is_in_equation(text, match.start()):
-                    continue
+        # Locate equation blocks once; each candidate is then a binary search
+        if index is None:
+            index = DocumentIndex.build(text)
 
-                # Extract and normalize numbers
-                content = match.group(1)
-                numbers = [
-                    num.strip()
-                    for num in re.split(r"[,\s]+", content)
-                    if num.strip().isdigit() and len(num.strip()) <= 3
-                ]
-
-                if numbers:
-                    # Get context window
-                    start_ctx = max(0, match.start() - CONTEXT_WINDOW)
-                    end_ctx = min(len(text), match.end() + CONTEXT_WINDOW)
-
-                    citation = Citation(
-                        text=match.group(0),
-                        context=text[start_ctx:end_ctx].strip(),
-                        citation_type="numeric",
-                        reference_id=f"ref_{numbers[0]}",
-                        location={"start": match.start(), "end": match.end()},
-                        normalized_text=",".join(sorted(numbers, key=int)),
-                    )
-                    citations.append(citation)
-
-        # Extract author-year citations
-        for pattern in self.author_patterns:
-            for match in re.finditer(pattern, text):
-                # Skip if within equation
-                if self._is_in_equation(text, match.start()):
-                    continue
+        for match in CITATION_PATTERN.finditer(text):
+            # Skip if within equation
+            if index.in_equation(match.start()):
+                continue
 
-                # Get context window
-                start_ctx = max(0, match.start() - CONTEXT_WINDOW)
-                end_ctx = min(len(text), match.end() + CONTEXT_WINDOW)
+            # Get context window
+            start_ctx = max(0, match.start() - CONTEXT_WINDOW)
+            end_ctx = min(len(text), match.end() + CONTEXT_WINDOW)
 
-                # Create citation
+            if match.lastgroup in NUMERIC_GROUPS:
+                # Extract and normalize numbers (strip the enclosing brackets)
+                numbers = self._extract_reference_numbers(match.group(0)[1:-1])
+                if not numbers:
+                    continue
+
+                citation = Citation(
+                    text=match.group(0),
+                    context=text[start_ctx:end_ctx].strip(),
+                    citation_type="numeric",
+                    reference_id=self._REF_IDS.get(numbers[0]) or f"ref_{numbers[0]}",
+                    location={"start": match.start(), "end": match.end()},
+                    normalized_text=",".join(sorted(numbers, key=int)),
+                )
+            else:
+                normalized = self._normalize_author_citation(match.group(0))
                 citation = Citation(
                     text=match.group(0),
                     context=text[start_ctx:end_ctx].strip(),
                     citation_type="author-year",
-                    reference_id=self._normalize_author_citation(match.group(0)),
+                    reference_id=normalized,
                     location={"start": match.start(), "end": match.end()},
-                    normalized_text=self._normalize_author_citation(match.group(0)),
+                    normalized_text=normalized,
                 )
-                citations.append(citation)
+            citations.append(citation)
 
         return citations
 
-    def _is_in_equation(self, text: str, position: int) -> bool:
-        """Check if position is within any equation block."""
-        for pattern in self.equation_markers:
-            for match in re.finditer(pattern, text, re.DOTALL):
-                if match.start() <= position <= match.end():
-                    return True
-        return False
+    def _extract_reference_numbers(self, content: str) -> List[str]:
+        """Split numeric citation content into reference numbers."""
+        return REF_NUMBER_PATTERN.findall(content)
 
     def _normalize_author_citation(self, text: str) -> str:
         """Normalize author-year citation text."""
-        text = text.lower()
-        text = re.sub(r"[\(\),]", "", text)  # Remove parentheses and commas
-        text = re.sub(r"\s*et\s+al\.\s*", "_et_al_", text)  # Normalize et al.
-        text = re.sub(r"\s+", "_", text.strip())  # Replace spaces with underscores
-        return text
+        # Split on any whitespace and rejoin, e.g. "Smith et al. (2023)" -> "smith_et_al_2023"
+        return "_".join(text.lower().translate(AUTHOR_TABLE).split())
 
     def extract_unique_references(self, citations: List[Citation]) -> Set[str]:
         """Extract unique reference identifiers from citations."""
         unique_refs = set()
         for citation in citations:
             if citation.citation_type == "numeric":
-                numbers = re.findall(r"\d+", citation.text)
-                unique_refs.update(f"ref_{num}" for num in numbers)
+                numbers = DIGITS_PATTERN.findall(citation.text)
+                ref_ids = self._REF_IDS
+                unique_refs.update(ref_ids.get(num) or f"ref_{num}" for num in numbers)
             else:
                 unique_refs.add(citation.reference_id)
         return unique_refs
@@ -148,11 +161,5 @@ class CitationExtractor:
         if not ref.authors:
             return ""
 
-        # Get first author's family name
-        first_author = ref.authors[0].family or ref.authors[0].full_name.split()[-1]
-
-        # Add year if available
-        if ref.year:
-            return f"{first_author.lower()}_{ref.year}"
-
-        return first_author.lower()
+        first_author = ref.authors[0]
+        return _reference_match_key(first_author.family, first_author.full_name, ref.year)
@@ -0,0 +1,115 @@
+"""Persistent on-disk cache for Crossref reference lookups."""
+
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+from ...utils.constants import CROSSREF_CACHE_TTL, CROSSREF_MEMORY_CACHE_SIZE, CROSSREF_NEGATIVE_TTL
+from ...utils.logger import logger
+
+
+class CrossrefCache:
+    """Cache raw Crossref reference records per DOI in a SQLite table.
+
+    An empty list is cached as a negative lookup (DOI unknown or without
+    references) with a shorter TTL, so known misses skip the API as well.
+    Recently used entries are also kept in a bounded in-process LRU, so repeat
+    lookups within a run skip SQLite and decompression.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = CROSSREF_CACHE_TTL,
+        negative_ttl: float = CROSSREF_NEGATIVE_TTL,
+        memory_size: int = CROSSREF_MEMORY_CACHE_SIZE,
+    ):
+        """Open (or create) the cache database."""
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory_size = memory_size
+        self._memory: OrderedDict[str, Tuple[float, List[Dict[str, Any]]]] = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS crossref"
+                " (doi TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload BLOB NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the cache database, committing on success and always closing it."""
+        # One short-lived connection per call keeps the cache safe to use from worker threads
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key(doi: str) -> str:
+        # DOIs are case-insensitive
+        return doi.strip().lower()
+
+    def _remember(self, key: str, expires_at: float, refs_data: List[Dict[str, Any]]):
+        """Put an entry in the in-process LRU, evicting the least recently used one."""
+        if self.memory_size <= 0:
+            return
+        with self._memory_lock:
+            self._memory[key] = (expires_at, refs_data)
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get(self, doi: str) -> Optional[List[Dict[str, Any]]]:
+        """Return cached reference records, [] for a cached miss, or None if not cached."""
+        key = self._key(doi)
+        now = time.time()
+        with self._memory_lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                if hit[0] > now:
+                    self._memory.move_to_end(key)
+                    return hit[1]
+                del self._memory[key]
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT expires_at, payload FROM crossref WHERE doi = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+            if row is None:
+                return None
+            refs_data = orjson.loads(zlib.decompress(row[1]))
+            self._remember(key, row[0], refs_data)
+            return refs_data
+
+        except (sqlite3.Error, zlib.error, orjson.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Crossref cache read failed: {str(e)}")
+            return None
+
+    def set(self, doi: str, refs_data: List[Dict[str, Any]]):
+        """Store reference records for a DOI; an empty list records a negative lookup."""
+        key = self._key(doi)
+        expires_at = time.time() + (self.ttl if refs_data else self.negative_ttl)
+        self._remember(key, expires_at, refs_data)
+        try:
+            payload = zlib.compress(orjson.dumps(refs_data))
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO crossref (doi, expires_at, payload) VALUES (?, ?, ?)",
+                    (key, expires_at, payload),
+                )
+
+        except (sqlite3.Error, orjson.JSONEncodeError) as e:
+            logger.warning(f"⚠️ Crossref cache write failed: {str(e)}")
@@ -0,0 +1,72 @@
+"""Shared per-document pre-parse for the extractors."""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Equation delimiters (openers, closers); these are literals, so they
+# are located with str.find instead of lazy-quantifier regexes
+EQUATION_MARKERS = [
+    (("$$",), ("$$",)),  # Display math $$...$$
+    (("$",), ("$",)),  # Inline math $...$
+    ((r"\begin{equation}",), (r"\end{equation}",)),
+    ((r"\begin{align}", r"\begin{align*}"), (r"\end{align}", r"\end{align*}")),
+]
+
+
+def _find_first(text: str, tokens: Tuple[str, ...], start: int) -> Tuple[int, str]:
+    """Return the earliest position of any token at or after start, or (-1, "")."""
+    best, found = -1, ""
+    for token in tokens:
+        index = text.find(token, start)
+        if index >= 0 and (best < 0 or index < best):
+            best, found = index, token
+    return best, found
+
+
+def _scan_delimited(text: str, openers: Tuple[str, ...], closers: Tuple[str, ...]) -> List[Tuple[int, int]]:
+    """Find non-overlapping opener...closer spans, pairing each opener with the nearest closer."""
+    spans = []
+    pos = 0
+    while True:
+        start, opener = _find_first(text, openers, pos)
+        if start < 0:
+            break
+        end, closer = _find_first(text, closers, start + len(opener))
+        if end < 0:
+            break
+        pos = end + len(closer)
+        spans.append((start, pos))
+    return spans
+
+
+def compute_equation_spans(text: str) -> List[Tuple[int, int]]:
+    """Find all equation blocks as sorted, merged (start, end) intervals."""
+    spans = sorted(span for openers, closers in EQUATION_MARKERS for span in _scan_delimited(text, openers, closers))
+
+    merged: List[Tuple[int, int]] = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass(frozen=True)
+class DocumentIndex:
+    """Equation spans of a document, computed once and shared by every extractor."""
+
+    equation_spans: List[Tuple[int, int]]
+    equation_starts: List[int]
+
+    @classmethod
+    def build(cls, text: str) -> "DocumentIndex":
+        """Pre-parse a document."""
+        spans = compute_equation_spans(text)
+        return cls(equation_spans=spans, equation_starts=[start for start, _ in spans])
+
+    def in_equation(self, position: int) -> bool:
+        """Check if position is within any equation block."""
+        i = bisect_right(self.equation_starts, position) - 1
+        return i >= 0 and self.equation_spans[i][1] >= position
@@ -5,50 +5,112 @@ from typing import List
 
 from ..metadata.models import Equation, Symbol
 
+# Named content group -> equation type; earlier alternatives win at the same position
+EQUATION_TYPES = {
+    "dollar_display": "display",
+    "inline": "inline",
+    "numbered": "numbered",
+    "bracket_display": "display",
+    "align": "display",
+    "eqnarray": "display",
+}
+EQUATION_PATTERN = re.compile(
+    "|".join(
+        [
+            # Bodies use unrolled loops (no lazy ".*?") so each match is a single forward scan
+            r"\$\$(?P<dollar_display>[^$]*(?:\$(?!\$)[^$]*)*)\$\$",  # Display equations
+            r"\$(?P<inline>[^$]*)\$",  # Inline equations
+            r"\\begin\{equation\}(?P<numbered>[^\\]*(?:\\(?!end\{equation\})[^\\]*)*)\\end\{equation\}",
+            r"\\\[(?P<bracket_display>[^\\]*(?:\\(?!\])[^\\]*)*)\\\]",
+            r"\\begin\{align\*?\}(?P<align>[^\\]*(?:\\(?!end\{align\*?\})[^\\]*)*)\\end\{align\*?\}",
+            r"\\begin\{eqnarray\*?\}(?P<eqnarray>[^\\]*(?:\\(?!end\{eqnarray\*?\})[^\\]*)*)\\end\{eqnarray\*?\}",
+        ]
+    ),
+    re.DOTALL,
+)
+
+# Common mathematical symbols
+GREEK_LETTERS = [
+    "alpha",
+    "beta",
+    "gamma",
+    "delta",
+    "epsilon",
+    "zeta",
+    "eta",
+    "theta",
+    "iota",
+    "kappa",
+    "lambda",
+    "mu",
+    "nu",
+    "xi",
+    "omicron",
+    "pi",
+    "rho",
+    "sigma",
+    "tau",
+    "upsilon",
+    "phi",
+    "chi",
+    "psi",
+    "omega",
+]
+
+OPERATORS = [
+    "sum",
+    "prod",
+    "int",
+    "oint",
+    "partial",
+    "nabla",
+    "infty",
+    "pm",
+    "mp",
+    "times",
+    "div",
+    "cdot",
+    "equiv",
+    "approx",
+    "propto",
+]
+
+# One alternation per symbol class instead of a search per name
+GREEK_PATTERN = re.compile(r"\\(" + "|".join(GREEK_LETTERS) + r")\b")
+OPERATOR_PATTERN = re.compile(r"\\(" + "|".join(OPERATORS) + r")\b")
+
 
 class EquationExtractor:
     """Extract equations from academic text."""
 
-    def __init__(self):
-        """Initialize equation patterns."""
-        self.patterns = [
-            (r"\$\$(.*?)\$\$", "display"),  # Display equations
-            (r"\$(.*?)\$", "inline"),  # Inline equations
-            (r"\\begin\{equation\}(.*?)\\end\{equation\}", "numbered"),
-            (r"\\[(.*?)\\]", "display"),
-            (r"\\begin\{align\*?\}(.*?)\\end\{align\*?\}", "display"),
-            (r"\\begin\{eqnarray\*?\}(.*?)\\end\{eqnarray\*?\}", "display"),
-        ]
-
     def extract_equations(self, markdown: str) -> List[Equation]:
         """Extract equations from markdown text."""
         equations = []
 
         try:
-            # Process each type of equation
-            for pattern, eq_type in self.patterns:
-                for match in re.finditer(pattern, markdown, re.DOTALL):
-                    content = match.group(1).strip()
-                    if not content:
-                        continue
-
-                    # Get equation context
-                    start_pos = match.start()
-                    end_pos = match.end()
-                    context = self._get_equation_context(markdown, start_pos, end_pos)
-
-                    # Extract symbols
-                    symbols = self._extract_symbols(content)
-
-                    # Create equation object
-                    equation = Equation(
-                        content=content,
-                        context=context,
-                        symbols=symbols,
-                        equation_type=eq_type,
-                        location={"start": start_pos, "end": end_pos},
-                    )
-                    equations.append(equation)
+            # Single pass over the markdown for every equation type
+            for match in EQUATION_PATTERN.finditer(markdown):
+                content = match.group(match.lastgroup).strip()
+                if not content:
+                    continue
+
+                # Get equation context
+                start_pos = match.start()
+                end_pos = match.end()
+                context = self._get_equation_context(markdown, start_pos, end_pos)
+
+                # Extract symbols
+                symbols = self._extract_symbols(content)
+
+                # Create equation object
+                equation = Equation(
+                    content=content,
+                    context=context,
+                    symbols=symbols,
+                    equation_type=EQUATION_TYPES[match.lastgroup],
+                    location={"start": start_pos, "end": end_pos},
+                )
+                equations.append(equation)
 
             return equations
 
@@ -73,62 +135,16 @@ class EquationExtractor:
         """Extract mathematical symbols from equation."""
         symbols = []
 
-        # Common mathematical symbols
-        greek_letters = [
-            "alpha",
-            "beta",
-            "gamma",
-            "delta",
-            "epsilon",
-            "zeta",
-            "eta",
-            "theta",
-            "iota",
-            "kappa",
-            "lambda",
-            "mu",
-            "nu",
-            "xi",
-            "omicron",
-            "pi",
-            "rho",
-            "sigma",
-            "tau",
-            "upsilon",
-            "phi",
-            "chi",
-            "psi",
-            "omega",
-        ]
-
-        operators = [
-            "sum",
-            "prod",
-            "int",
-            "oint",
-            "partial",
-            "nabla",
-            "infty",
-            "pm",
-            "mp",
-            "times",
-            "div",
-            "cdot",
-            "equiv",
-            "approx",
-            "propto",
-        ]
-
         # Look for Greek letters
-        for letter in greek_letters:
-            pattern = rf"\\{letter}\b"
-            if re.search(pattern, equation):
+        found_greek = set(GREEK_PATTERN.findall(equation))
+        for letter in GREEK_LETTERS:
+            if letter in found_greek:
                 symbols.append(Symbol(symbol=f"\\{letter}", type="greek", latex_command=f"\\{letter}"))
 
         # Look for operators
-        for op in operators:
-            pattern = rf"\\{op}\b"
-            if re.search(pattern, equation):
+        found_operators = set(OPERATOR_PATTERN.findall(equation))
+        for op in OPERATORS:
+            if op in found_operators:
                 symbols.append(Symbol(symbol=f"\\{op}", type="operator", latex_command=f"\\{op}"))
 
         return symbols
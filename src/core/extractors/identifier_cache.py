@@ -0,0 +1,70 @@
+"""Persistent on-disk cache for PDF identifier lookups."""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import orjson
+
+from ...utils.constants import IDENTIFIER_CACHE_TTL, IDENTIFIER_NEGATIVE_TTL
+from ...utils.logger import logger
+
+
+class IdentifierCache:
+    """Cache identifier lookups per PDF content hash in a SQLite table.
+
+    An empty dict is cached as a negative lookup (no identifier found) with a
+    shorter TTL, since pdf2doi misses can come from transient network errors.
+    """
+
+    def __init__(self, path: Path, ttl: float = IDENTIFIER_CACHE_TTL, negative_ttl: float = IDENTIFIER_NEGATIVE_TTL):
+        """Open (or create) the cache database."""
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS identifiers"
+                " (file_hash TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload BLOB NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the cache database, committing on success and always closing it."""
+        # One short-lived connection per call keeps the cache safe to use from worker threads
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the cached identifier info, {} for a cached miss, or None if not cached."""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload FROM identifiers WHERE file_hash = ? AND expires_at > ?", (file_hash, time.time())
+                ).fetchone()
+            return orjson.loads(row[0]) if row else None
+
+        except (sqlite3.Error, orjson.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Identifier cache read failed: {str(e)}")
+            return None
+
+    def set(self, file_hash: str, identifier_info: Optional[Dict[str, Any]]):
+        """Store identifier info for a file hash; None or {} records a negative lookup."""
+        identifier_info = identifier_info or {}
+        ttl = self.ttl if identifier_info else self.negative_ttl
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO identifiers (file_hash, expires_at, payload) VALUES (?, ?, ?)",
+                    (file_hash, time.time() + ttl, orjson.dumps(identifier_info)),
+                )
+
+        except (sqlite3.Error, orjson.JSONEncodeError) as e:
+            logger.warning(f"⚠️ Identifier cache write failed: {str(e)}")
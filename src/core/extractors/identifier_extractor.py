@@ -1,18 +1,42 @@
 """Extract DOI/arXiv identifiers from PDFs."""
+import re
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 import pdf2doi
 
-from ...utils.constants import ERROR_MESSAGES, SUCCESS_MESSAGES
+from ...utils.constants import ERROR_MESSAGES, IDENTIFIER_CACHE_PATH, SUCCESS_MESSAGES
 from ...utils.logger import logger
+from .identifier_cache import IdentifierCache
+
+# New-style (2301.12345) or old-style (cs.CV/0701001) arXiv IDs, optional version
+ARXIV_ID_PATTERN = re.compile(r"(?:arxiv[:.])?([a-z\-.]+/\d{7}|\d{4}\.\d{4,5})(?:v\d+)?", re.IGNORECASE)
 
 
 class IdentifierExtractor:
     """Extract DOI or arXiv ID from PDFs using pdf2doi."""
 
-    def extract_identifier(self, file_path: Path) -> Optional[Dict[str, Any]]:
-        """Extract identifier and type from PDF."""
+    def __init__(self, cache_path: Optional[Path] = IDENTIFIER_CACHE_PATH):
+        """Initialize extractor.
+
+        Lookups are cached by file hash at cache_path; pass None to disable caching.
+        """
+        self.cache = IdentifierCache(cache_path) if cache_path else None
+
+    def extract_identifier(self, file_path: Path, file_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Extract identifier and type from PDF, reusing a cached lookup when file_hash is given."""
+        if file_hash and self.cache is not None:
+            cached = self.cache.get(file_hash)
+            if cached is not None:
+                return cached or None
+
+        identifier_info = self._lookup_identifier(file_path)
+        if file_hash and self.cache is not None:
+            self.cache.set(file_hash, identifier_info)
+        return identifier_info
+
+    def _lookup_identifier(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Look up identifier and type with pdf2doi."""
         try:
             logger.info(f"Extracting identifier from {file_path}")
 
@@ -57,17 +81,8 @@ class IdentifierExtractor:
 
     def _clean_arxiv_id(self, arxiv_id: str) -> str:
         """Clean and standardize arXiv ID format."""
-        # Remove 'arxiv:' prefix if present
-        arxiv_id = arxiv_id.lower()
-        if 'arxiv.' in arxiv_id:
-            arxiv_id = arxiv_id.split('arxiv.')[-1]
-        if 'arxiv:' in arxiv_id:
-            arxiv_id = arxiv_id.split('arxiv:')[-1]
-
-        # Remove version number if present
-        if 'v' in arxiv_id:
-            arxiv_id = arxiv_id.split('v')[0]
-
-        # Remove any remaining special characters
-        arxiv_id = arxiv_id.strip('/')
-        return arxiv_id.strip()
+        # Drop any 'arxiv:'/'arxiv.' prefix and version suffix in a single match
+        match = ARXIV_ID_PATTERN.search(arxiv_id)
+        if match:
+            return match.group(1).lower()
+        return arxiv_id.strip().strip('/').lower()
@@ -1,8 +1,12 @@
 """PDF text extraction using marker-pdf."""
 
 import hashlib
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import List, NamedTuple, Optional, Tuple
 
 from marker.converters.pdf import PdfConverter
 from marker.models import create_model_dict
@@ -12,19 +16,64 @@ from ...utils.constants import ERROR_MESSAGES, SUCCESS_MESSAGES
 from ...utils.logger import logger
 
 
+class ExtractionResult(NamedTuple):
+    """Result of content extraction step."""
+
+    text: Optional[str]
+    markdown: Optional[str]
+    file_hash: str
+    success: bool
+    error: Optional[str] = None
+
+
 class PDFExtractor:
     """Extract text and metadata from PDFs using marker-pdf."""
 
-    def __init__(self):
-        """Initialize marker-pdf extractor with configuration."""
-        # Initialize with just the model dict, no additional config
-        self.marker = PdfConverter(artifact_dict=create_model_dict())
+    _marker: Optional[PdfConverter] = None
+    _hash_pool: Optional[ThreadPoolExecutor] = None
+    # Guard the lazy shared objects, so concurrent first calls load the models once;
+    # separate locks keep hashing from waiting on the model load
+    _marker_lock = threading.Lock()
+    _hash_pool_lock = threading.Lock()
+    # Marker's converter is not known to be thread-safe: one render at a time, while
+    # hashing and the pipeline's I/O stages still overlap it
+    _render_lock = threading.Lock()
+
+    @classmethod
+    def _get_marker(cls) -> PdfConverter:
+        """Load marker models once and share the converter across instances."""
+        if cls._marker is None:
+            with cls._marker_lock:
+                if cls._marker is None:
+                    # Initialize with just the model dict, no additional config
+                    cls._marker = PdfConverter(artifact_dict=create_model_dict())
+        return cls._marker
+
+    @classmethod
+    def _get_hash_pool(cls) -> ThreadPoolExecutor:
+        """Threads that hash files while marker renders, shared across instances."""
+        if cls._hash_pool is None:
+            with cls._hash_pool_lock:
+                if cls._hash_pool is None:
+                    cls._hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="pdf-hash")
+        return cls._hash_pool
+
+    @property
+    def marker(self) -> PdfConverter:
+        """Shared marker-pdf converter, created on first use."""
+        return self._get_marker()
+
+    def _convert(self, file_path: Path):
+        """Render a PDF with the shared converter, one render at a time."""
+        marker = self._get_marker()
+        with self._render_lock:
+            return marker(str(file_path))
 
     def extract_text(self, file_path: Path) -> Optional[str]:
         """Extract text content from PDF."""
         try:
             logger.info(f"Extracting text from {file_path}")
-            rendered = self.marker(str(file_path))
+            rendered = self._convert(file_path)
             text, _, _ = text_from_rendered(rendered)
             logger.info(SUCCESS_MESSAGES["text_extraction"])
             return text
@@ -37,7 +86,7 @@ class PDFExtractor:
         """Extract markdown content from PDF."""
         try:
             logger.info(f"Converting {file_path} to markdown")
-            rendered = self.marker(str(file_path))
+            rendered = self._convert(file_path)
             markdown = rendered.markdown
             logger.info("✓ Markdown conversion successful")
             return markdown
@@ -49,17 +98,64 @@ class PDFExtractor:
     def get_file_hash(self, file_path: Path) -> str:
         """Generate SHA-256 hash of file content."""
         try:
-            sha256_hash = hashlib.sha256()
             with open(file_path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(byte_block)
-            return sha256_hash.hexdigest()
+                try:
+                    # Hash straight from the page cache without copying into bytes objects
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        if hasattr(mmap, "MADV_SEQUENTIAL"):
+                            mm.madvise(mmap.MADV_SEQUENTIAL)
+                        return hashlib.sha256(mm).hexdigest()
+                except (ValueError, OSError):
+                    # Empty files and non-mappable streams cannot be mmapped
+                    f.seek(0)
+                    return hashlib.file_digest(f, "sha256").hexdigest()
         except Exception as e:
             logger.error(f"Error generating file hash: {e}")
             return ""
 
-    def extract_all(self, file_path: Path) -> Dict[str, Any]:
-        """Extract both text and markdown with file hash."""
-        text = self.extract_text(file_path)
-        markdown = self.extract_markdown(file_path)
-        return {"text": text, "markdown": markdown, "file_hash": self.get_file_hash(file_path)}
+    def _render_content(
+        self, file_path: Path, want_text: bool = True, want_markdown: bool = True
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Render a PDF once and return the requested text and markdown."""
+        try:
+            logger.info(f"Extracting text and markdown from {file_path}")
+            rendered = self._convert(file_path)
+            text = text_from_rendered(rendered)[0] if want_text else None
+            markdown = rendered.markdown if want_markdown else None
+            logger.info(SUCCESS_MESSAGES["text_extraction"])
+            return text, markdown
+
+        except Exception as e:
+            logger.error(ERROR_MESSAGES["extraction_failed"].format(step="text", error=str(e)))
+            return None, None
+
+    def _result(
+        self, text: Optional[str], markdown: Optional[str], file_hash: str, want_text: bool, want_markdown: bool
+    ) -> ExtractionResult:
+        """Bundle rendered content, marking the result failed if a requested output is missing."""
+        success = bool((text or not want_text) and (markdown or not want_markdown))
+        error = None if success else "Failed to extract text content"
+        return ExtractionResult(text, markdown, file_hash, success, error)
+
+    def extract_all(self, file_path: Path, want_text: bool = True, want_markdown: bool = True) -> ExtractionResult:
+        """Extract text and/or markdown with file hash.
+
+        Outputs that are not requested are returned as None so callers that
+        only need one representation do not keep the other alive.
+        """
+        # Hash while marker renders; hashlib drops the GIL on large buffers, and marker reads a warm page cache
+        file_hash = self._get_hash_pool().submit(self.get_file_hash, file_path)
+        text, markdown = self._render_content(file_path, want_text=want_text, want_markdown=want_markdown)
+        return self._result(text, markdown, file_hash.result(), want_text, want_markdown)
+
+    def extract_batch(
+        self, file_paths: List[Path], want_text: bool = True, want_markdown: bool = True
+    ) -> List[ExtractionResult]:
+        """Extract several PDFs, hashing in worker threads while marker renders."""
+        pool = self._get_hash_pool()
+        hashes = [pool.submit(self.get_file_hash, file_path) for file_path in file_paths]
+        results = []
+        for file_path, file_hash in zip(file_paths, hashes, strict=True):
+            text, markdown = self._render_content(file_path, want_text=want_text, want_markdown=want_markdown)
+            results.append(self._result(text, markdown, file_hash.result(), want_text, want_markdown))
+        return results
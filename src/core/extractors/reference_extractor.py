@@ -1,22 +1,126 @@
 """Extract references using Crossref API and Anystyle."""
-import json
+import atexit
+import os
+import queue
+import re
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import requests
-
-from ...utils.constants import CROSSREF_API_URL, ERROR_MESSAGES, SUCCESS_MESSAGES
+from pydantic import ValidationError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ...utils.constants import (
+    ARXIV_DOI_PREFIX,
+    CROSSREF_API_URL,
+    CROSSREF_BATCH_SIZE,
+    CROSSREF_CACHE_PATH,
+    CROSSREF_HEADERS,
+    CROSSREF_MAX_CONCURRENT,
+    CROSSREF_SELECT_FIELDS,
+    CROSSREF_TIMEOUT,
+    ERROR_MESSAGES,
+    SUCCESS_MESSAGES,
+)
+from ...utils.event_loop import to_thread
 from ...utils.logger import logger
-from ..metadata.models import Author, Reference
+from ..metadata.models import REFERENCE_LIST_ADAPTER, Reference
+from .crossref_cache import CrossrefCache
+
+# Long-lived Anystyle worker: reads a references section up to a sentinel line and
+# answers with the same JSON `anystyle --format json parse` prints, on one line
+ANYSTYLE_SENTINEL = "\f"
+ANYSTYLE_WORKER_SCRIPT = """
+require "anystyle"
+require "json"
+$stdout.sync = true
+buffer = []
+STDIN.each_line do |line|
+  if line.chomp == "\f"
+    puts JSON.generate(AnyStyle.parse(buffer.join, format: "hash"))
+    buffer = []
+  else
+    buffer << line
+  end
+end
+"""
+
+# Section markers, matched anywhere in a line; ASCII-only case folding mirrors str.lower() for these words
+REFERENCES_START_PATTERN = re.compile(r"references|bibliography", re.IGNORECASE | re.ASCII)
+REFERENCES_END_PATTERN = re.compile(r"appendix|acknowledgments", re.IGNORECASE | re.ASCII)
+
+# Separators between names in a Crossref author string: "A and B", "A & B", "A; B"
+AUTHOR_SEPARATOR_PATTERN = re.compile(r"\s+(?:and|&)\s+|\s*;\s*", re.IGNORECASE)
+
+
+class AnystyleWorker:
+    """Long-lived Anystyle process that parses one references section at a time."""
+
+    def __init__(self):
+        """Create the worker; the Ruby process starts on the first parse."""
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def parse(self, ref_section: str) -> List[Dict[str, Any]]:
+        """Parse a references section, raising if the worker cannot answer."""
+        with self._lock:
+            try:
+                process = self._get_process()
+                # The sentinel line ends one request; a stray form feed in the text would end it early
+                process.stdin.write(ref_section.replace(ANYSTYLE_SENTINEL, ' ') + f"\n{ANYSTYLE_SENTINEL}\n")
+                process.stdin.flush()
+                line = process.stdout.readline()
+                if not line:
+                    raise RuntimeError("worker exited")
+                return orjson.loads(line)
+
+            except Exception:
+                self._stop()
+                raise
+
+    def close(self):
+        """Terminate the Ruby process if it is running."""
+        with self._lock:
+            self._stop()
+
+    def _get_process(self) -> subprocess.Popen:
+        """Start the Ruby process on first use so Anystyle boots once per worker."""
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ['ruby', '-e', ANYSTYLE_WORKER_SCRIPT],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding='utf-8',
+            )
+            # Don't leave the Ruby process behind if the interpreter exits without close()
+            atexit.register(self.close)
+        return self._process
+
+    def _stop(self):
+        """Kill the Ruby process; callers hold the lock."""
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+            atexit.unregister(self.close)
 
 
 class ReferenceExtractor:
     """Extract references using Crossref API and Anystyle fallback."""
 
-    def __init__(self):
-        """Initialize reference extractor and check Anystyle availability."""
+    def __init__(self, cache_path: Optional[Path] = CROSSREF_CACHE_PATH):
+        """Initialize reference extractor and check Anystyle availability.
+
+        Crossref responses are cached at cache_path; pass None to disable caching.
+        """
         self.anystyle_available = False
         try:
             result = subprocess.run(['anystyle', '--version'], capture_output=True, text=True)
@@ -26,84 +130,252 @@ class ReferenceExtractor:
         except (subprocess.CalledProcessError, FileNotFoundError):
             logger.warning("⚠️ Anystyle not found. Please install it with: gem install anystyle-cli")
 
+        # Persistent Anystyle process, started lazily on the first parse
+        self._anystyle_worker = AnystyleWorker()
+        self._use_anystyle_worker = True
+
+        # Shared connection pool so Crossref queries reuse TCP/TLS connections; rate
+        # limits (429) and transient errors are retried with backoff, honoring Retry-After
+        self.session = requests.Session()
+        self.session.headers.update(CROSSREF_HEADERS)
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+        )
+        self.session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry))
+
+        self.cache = CrossrefCache(cache_path) if cache_path else None
+
     def extract_references(self, identifier: str, identifier_type: str, text: Optional[str] = None) -> List[Reference]:
         """Extract references based on identifier type, falling back to text extraction."""
-        if identifier_type.lower() == 'doi':
+        identifier_type = identifier_type.lower()
+        if identifier_type == 'doi':
             # Try Crossref first for DOIs
             refs = self._extract_from_crossref(identifier)
             if refs:
                 return refs
+        elif identifier_type == 'arxiv':
+            # arXiv IDs map to a DOI locally; a Crossref hit skips the Anystyle run
+            refs = self._extract_from_crossref(f"{ARXIV_DOI_PREFIX}{identifier}")
+            if refs:
+                return refs
 
-        # For arXiv IDs or if Crossref failed, try text extraction
+        # If Crossref had nothing, try text extraction
         if text:
             return self._extract_from_text(text)
         return []
 
+    async def extract_references_async(
+        self, identifier: str, identifier_type: str, text: Optional[str] = None
+    ) -> List[Reference]:
+        """Extract references in a worker thread so Crossref and Anystyle I/O overlaps other async work."""
+        return await to_thread(self.extract_references, identifier, identifier_type, text)
+
     def _extract_from_crossref(self, doi: str) -> List[Reference]:
         """Extract references from Crossref API."""
         try:
-            url = f"{CROSSREF_API_URL}{doi}"
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-
-            if "reference" not in data.get("message", {}):
+            refs_data = self._fetch_crossref_references(doi)
+            if not refs_data:
                 logger.warning("No references found in Crossref data")
                 return []
 
-            refs_data = data["message"]["reference"]
             logger.info(SUCCESS_MESSAGES["references_found"].format(count=len(refs_data)))
 
-            references = []
-            for ref in refs_data:
-                try:
-                    # Extract title
-                    title = ref.get('article-title', '') or ref.get('title', '')
-
-                    # Extract authors
-                    authors = []
-                    if 'author' in ref:
-                        author_str = ref['author']
-                        # Split multiple authors if present
-                        author_names = [a.strip() for a in author_str.split(' and ') if a.strip()]
-                        for name in author_names:
-                            authors.append(Author(full_name=name))
-
-                    # Extract year
-                    year = None
-                    if 'year' in ref:
-                        try:
-                            year = int(ref['year'])
-                        except (ValueError, TypeError):
-                            pass
-
-                    # Extract DOI if available
-                    doi = ref.get('DOI') or ref.get('doi')
-
-                    # Create reference
-                    reference = Reference(
-                        title=title,
-                        authors=authors,
-                        year=year,
-                        doi=doi,
-                        raw_text=ref.get('unstructured', '')
-                    )
-                    references.append(reference)
+            return self._parse_crossref_references(refs_data)
 
-                except Exception as e:
-                    logger.error(f"⚠️ Error parsing Crossref reference: {str(e)}")
-                    continue
+        except Exception as e:
+            logger.error(ERROR_MESSAGES["api_error"].format(
+                service="Crossref",
+                error=str(e)
+            ))
+            return []
 
-            return references
+    def _fetch_crossref_references(self, doi: str) -> List[Dict[str, Any]]:
+        """Return raw Crossref reference records for a DOI, consulting the cache first."""
+        if self.cache is not None:
+            cached = self.cache.get(doi)
+            if cached is not None:
+                return cached
+
+        url = f"{CROSSREF_API_URL}{doi}"
+        response = self.session.get(url, timeout=CROSSREF_TIMEOUT)
+        if response.status_code == 404:
+            # Unknown DOI: remember the miss instead of raising
+            refs_data = []
+        else:
+            response.raise_for_status()
+            refs_data = orjson.loads(response.content).get("message", {}).get("reference", [])
+
+        if self.cache is not None:
+            self.cache.set(doi, refs_data)
+        return refs_data
+
+    def extract_references_batch(self, identifiers: List[Tuple[str, str]]) -> Dict[str, List[Reference]]:
+        """Extract Crossref references for many (identifier, identifier_type) pairs.
+
+        DOIs are grouped into filter queries of CROSSREF_BATCH_SIZE, so N documents
+        cost one request per chunk instead of one per DOI, and the chunks are
+        fetched concurrently. Identifiers without Crossref data, and non-DOI
+        identifiers, map to an empty list.
+        """
+        results: Dict[str, List[Reference]] = {identifier: [] for identifier, _ in identifiers}
+        dois = list(dict.fromkeys(
+            identifier for identifier, identifier_type in identifiers if identifier_type.lower() == 'doi'
+        ))
+
+        # Serve cached DOIs locally; only misses go to Crossref
+        pending = []
+        for doi in dois:
+            cached = self.cache.get(doi) if self.cache is not None else None
+            if cached is None:
+                pending.append(doi)
+            elif cached:
+                results[doi] = self._parse_crossref_references(cached)
+
+        chunks = [pending[i:i + CROSSREF_BATCH_SIZE] for i in range(0, len(pending), CROSSREF_BATCH_SIZE)]
+        if len(chunks) > 1:
+            # Chunks are independent queries; issue them together so the batch costs about one round trip
+            with ThreadPoolExecutor(max_workers=min(len(chunks), CROSSREF_MAX_CONCURRENT)) as executor:
+                chunk_items = list(executor.map(self._fetch_crossref_batch, chunks))
+        else:
+            chunk_items = [self._fetch_crossref_batch(chunk) for chunk in chunks]
+
+        for chunk, items in zip(chunks, chunk_items, strict=True):
+            if items is None:
+                continue
+
+            # Crossref DOIs are case-insensitive; demultiplex items back to the requested DOIs
+            items_by_doi = {item.get('DOI', '').lower(): item for item in items}
+            for doi in chunk:
+                refs_data = items_by_doi.get(doi.lower(), {}).get('reference', [])
+                if self.cache is not None:
+                    self.cache.set(doi, refs_data)
+                if refs_data:
+                    results[doi] = self._parse_crossref_references(refs_data)
+
+        found = sum(1 for refs in results.values() if refs)
+        logger.info(f"✓ Crossref batch: references for {found}/{len(dois)} DOIs")
+        return results
+
+    def _fetch_crossref_batch(self, dois: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Fetch Crossref work records for a chunk of DOIs in a single request, or None on failure."""
+        try:
+            response = self.session.get(
+                CROSSREF_API_URL.rstrip('/'),
+                params={
+                    'filter': ','.join(f"doi:{doi}" for doi in dois),
+                    'rows': len(dois),
+                    'select': CROSSREF_SELECT_FIELDS,
+                },
+                timeout=CROSSREF_TIMEOUT,
+            )
+            response.raise_for_status()
+            return orjson.loads(response.content).get("message", {}).get("items", [])
 
         except Exception as e:
             logger.error(ERROR_MESSAGES["api_error"].format(
                 service="Crossref",
                 error=str(e)
             ))
+            return None
+
+    def _parse_crossref_references(self, refs_data: List[Dict[str, Any]]) -> List[Reference]:
+        """Convert Crossref reference records into Reference models."""
+        records = []
+        for ref in refs_data:
+            try:
+                # Extract title
+                title = ref.get('article-title', '') or ref.get('title', '')
+
+                # Extract authors
+                authors = []
+                if 'author' in ref:
+                    author_str = ref['author']
+                    # Split multiple authors if present
+                    author_names = [a.strip() for a in AUTHOR_SEPARATOR_PATTERN.split(author_str) if a.strip()]
+                    for name in author_names:
+                        authors.append({'full_name': name})
+
+                # Extract year
+                year = None
+                if 'year' in ref:
+                    try:
+                        year = int(ref['year'])
+                    except (ValueError, TypeError):
+                        pass
+
+                # Extract DOI if available
+                doi = ref.get('DOI') or ref.get('doi')
+
+                # Collect a plain record; models are validated together below
+                records.append({
+                    'title': title,
+                    'authors': authors,
+                    'year': year,
+                    'doi': doi,
+                    'raw_text': ref.get('unstructured', '')
+                })
+
+            except Exception as e:
+                logger.error(f"⚠️ Error parsing Crossref reference: {str(e)}")
+                continue
+
+        return self._validate_references(records, "Crossref reference")
+
+    def _validate_references(self, records: List[Dict[str, Any]], label: str) -> List[Reference]:
+        """Validate reference records in one pass, dropping only the records that fail."""
+        try:
+            return REFERENCE_LIST_ADAPTER.validate_python(records)
+        except ValidationError:
+            # Re-validate one by one so a single bad record does not discard the rest
+            references = []
+            for record in records:
+                try:
+                    references.append(Reference.model_validate(record))
+                except ValidationError as e:
+                    logger.error(f"⚠️ Error parsing {label}: {str(e)}")
+            return references
+
+    def extract_references_batch_text(
+        self, texts: List[str], max_workers: Optional[int] = None
+    ) -> List[List[Reference]]:
+        """Extract references from many documents' text, running several Anystyle workers side by side.
+
+        Results are returned in the order of texts.
+        """
+        if not texts:
             return []
 
-    def _extract_from_text(self, text: str) -> List[Reference]:
+        worker_count = min(len(texts), max_workers or max(1, (os.cpu_count() or 1) // 2))
+        # Each thread borrows a worker for one document; parsing runs in the Ruby processes
+        workers: queue.Queue = queue.Queue()
+        workers.put(self._anystyle_worker)
+        extra_workers = [AnystyleWorker() for _ in range(worker_count - 1)]
+        for worker in extra_workers:
+            workers.put(worker)
+
+        def extract(text: str) -> List[Reference]:
+            worker = workers.get()
+            try:
+                return self._extract_from_text(text, worker)
+            finally:
+                workers.put(worker)
+
+        results: List[List[Reference]] = [[] for _ in texts]
+        try:
+            with ThreadPoolExecutor(max_workers=worker_count) as executor:
+                futures = {executor.submit(extract, text): i for i, text in enumerate(texts)}
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+        finally:
+            for worker in extra_workers:
+                worker.close()
+
+        return results
+
+    def _extract_from_text(self, text: str, worker: Optional[AnystyleWorker] = None) -> List[Reference]:
         """Extract references from text using Anystyle."""
         if not self.anystyle_available:
             logger.warning("Anystyle not available for text extraction")
@@ -116,74 +388,54 @@ class ReferenceExtractor:
                 logger.warning("No references section found in text")
                 return []
 
-            # Create temporary file for Anystyle input
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as temp_in:
-                temp_in.write(ref_section)
-                temp_in_path = temp_in.name
+            references_data = self._run_anystyle(ref_section, worker)
+            logger.info(SUCCESS_MESSAGES["references_found"].format(count=len(references_data)))
 
-            try:
-                # Run Anystyle and capture output
-                result = subprocess.run(
-                    ['anystyle', '--format', 'json', 'parse', temp_in_path],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-
-                # Parse JSON output
-                references_data = json.loads(result.stdout)
-                logger.info(SUCCESS_MESSAGES["references_found"].format(count=len(references_data)))
-
-                # Parse references
-                references = []
-                for ref in references_data:
-                    try:
-                        # Extract title
-                        title = ref.get('title', [''])[0] if isinstance(ref.get('title'), list) else ref.get('title', '')
-
-                        # Extract authors
-                        authors = []
-                        author_list = ref.get('author', [])
-                        if isinstance(author_list, list):
-                            for author in author_list:
-                                if isinstance(author, dict):
-                                    given = author.get('given', '')
-                                    family = author.get('family', '')
-                                    if given or family:
-                                        full_name = f"{given} {family}".strip()
-                                        authors.append(Author(full_name=full_name))
-                                elif isinstance(author, str):
-                                    authors.append(Author(full_name=author))
-                        elif isinstance(author_list, str):
-                            authors.append(Author(full_name=author_list))
-
-                        # Extract year
-                        year = None
-                        year_data = ref.get('year', [''])[0] if isinstance(ref.get('year'), list) else ref.get('year', '')
-                        if year_data and isinstance(year_data, str):
-                            try:
-                                year = int(year_data)
-                            except ValueError:
-                                pass
-
-                        # Create reference
-                        reference = Reference(
-                            title=title,
-                            authors=authors,
-                            year=year,
-                            raw_text=ref.get('original', '')
-                        )
-                        references.append(reference)
-
-                    except Exception as e:
-                        logger.error(f"⚠️ Error parsing reference: {str(e)}")
-                        continue
-
-                return references
+            # Parse references
+            records = []
+            for ref in references_data:
+                try:
+                    # Extract title
+                    title = ref.get('title', [''])[0] if isinstance(ref.get('title'), list) else ref.get('title', '')
 
-            finally:
-                # Clean up temp file
-                Path(temp_in_path).unlink()
+                    # Extract authors
+                    authors = []
+                    author_list = ref.get('author', [])
+                    if isinstance(author_list, list):
+                        for author in author_list:
+                            if isinstance(author, dict):
+                                given = author.get('given', '')
+                                family = author.get('family', '')
+                                if given or family:
+                                    full_name = f"{given} {family}".strip()
+                                    authors.append({'full_name': full_name})
+                            elif isinstance(author, str):
+                                authors.append({'full_name': author})
+                    elif isinstance(author_list, str):
+                        authors.append({'full_name': author_list})
+
+                    # Extract year
+                    year = None
+                    year_data = ref.get('year', [''])[0] if isinstance(ref.get('year'), list) else ref.get('year', '')
+                    if year_data and isinstance(year_data, str):
+                        try:
+                            year = int(year_data)
+                        except ValueError:
+                            pass
+
+                    # Collect a plain record; models are validated together below
+                    records.append({
+                        'title': title,
+                        'authors': authors,
+                        'year': year,
+                        'raw_text': ref.get('original', '')
+                    })
+
+                except Exception as e:
+                    logger.error(f"⚠️ Error parsing reference: {str(e)}")
+                    continue
+
+            return self._validate_references(records, "reference")
 
         except Exception as e:
             logger.error(ERROR_MESSAGES["extraction_failed"].format(
@@ -192,24 +444,58 @@ class ReferenceExtractor:
             ))
             return []
 
+    def _run_anystyle(self, ref_section: str, worker: Optional[AnystyleWorker] = None) -> List[Dict[str, Any]]:
+        """Parse a references section, preferring a persistent Anystyle worker over a CLI run."""
+        if self._use_anystyle_worker:
+            try:
+                return (worker or self._anystyle_worker).parse(ref_section)
+            except Exception as e:
+                logger.warning(f"⚠️ Anystyle worker failed, falling back to CLI: {str(e)}")
+                self._use_anystyle_worker = False
+
+        return self._run_anystyle_cli(ref_section)
+
+    def _run_anystyle_cli(self, ref_section: str) -> List[Dict[str, Any]]:
+        """Parse a references section with a one-off Anystyle CLI process."""
+        # Create temporary file for Anystyle input
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as temp_in:
+            temp_in.write(ref_section)
+            temp_in_path = temp_in.name
+
+        try:
+            # Run Anystyle and capture output
+            result = subprocess.run(
+                ['anystyle', '--format', 'json', 'parse', temp_in_path],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            return orjson.loads(result.stdout)
+
+        finally:
+            # Clean up temp file
+            Path(temp_in_path).unlink()
+
     def _extract_references_section(self, text: str) -> Optional[str]:
         """Extract references section from text."""
         try:
-            lines = text.split('\n')
-            references_text = []
-            in_references = False
-
-            for line in lines:
-                if not in_references:
-                    if any(marker in line.lower() for marker in ['references', 'bibliography']):
-                        in_references = True
-                        continue
-                else:
-                    if any(marker in line.lower() for marker in ['appendix', 'acknowledgments']):
-                        break
-                    references_text.append(line)
-
-            return '\n'.join(references_text) if references_text else None
+            # The section starts on the line after the first line mentioning a start marker
+            start = REFERENCES_START_PATTERN.search(text)
+            if not start:
+                return None
+            newline = text.find('\n', start.end())
+            if newline < 0:
+                return None
+            body_start = newline + 1
+
+            # ...and runs up to, not including, the first later line mentioning an end marker
+            end = REFERENCES_END_PATTERN.search(text, body_start)
+            if not end:
+                return text[body_start:]
+            body_end = text.rfind('\n', newline, end.start())
+            if body_end == newline:
+                return None
+            return text[body_start:body_end]
 
         except Exception as e:
             logger.error(f"⚠️ Error extracting references section: {str(e)}")
@@ -1,25 +1,44 @@
 """Consolidate metadata from various extractors with enhanced validation."""
 
-import asyncio
-import json
+import mmap
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import aiofiles
+import orjson
 
 from ...utils.constants import DEFAULT_STORE_PATH, ProcessingState
+from ...utils.event_loop import to_thread
 from ...utils.logger import logger
-from .models import Author, Citation, DocumentMetadata, Equation, ProcessingMetadata, Reference, SchemaVersion, Symbol
+from .models import (
+    CITATION_LIST_ADAPTER,
+    EQUATION_LIST_ADAPTER,
+    REFERENCE_LIST_ADAPTER,
+    Author,
+    DocumentMetadata,
+    ProcessingMetadata,
+    SchemaVersion,
+    validate_list,
+)
 
+# Compact the store once this share of its pages is free after removals
+METADATA_COMPACT_RATIO = 0.25
 
-class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder for datetime objects."""
+# orjson serializes datetime and enum values natively; payloads are stored compact
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
 
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+
+def _to_author(author: Any) -> Author:
+    """Build an Author from a dict or name; Author instances are frozen, so they are shared as-is."""
+    if isinstance(author, Author):
+        return author
+    if isinstance(author, dict):
+        return Author(**author)
+    return Author(full_name=author)
 
 
 class ValidationError(Exception):
@@ -34,32 +53,82 @@ class MetadataConsolidator:
     def __init__(self, store_path: Path = DEFAULT_STORE_PATH):
         """Initialize consolidator with store path."""
         self.store_path = store_path
-        self.metadata_path = store_path / "metadata.json"
+        # One row per document, so saving a document no longer rewrites the whole store
+        self.metadata_path = store_path / "metadata.sqlite"
+        self.legacy_metadata_path = store_path / "metadata.json"
         self.schema_version = SchemaVersion()
+        self._schema_str = str(self.schema_version)
+
+        # Parsed documents, reused until the database changes on disk
+        self._cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._cache_stamp: Optional[Tuple] = None
+        self._cache_lock = threading.Lock()
+
         self._ensure_metadata_file()
 
+    def _store_stamp(self) -> Tuple:
+        """Return a fingerprint of the database files that changes on every write."""
+        stamp = []
+        for path in (self.metadata_path, self.metadata_path.with_name(self.metadata_path.name + "-wal")):
+            try:
+                stat = path.stat()
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection to the metadata database, committing on success and always closing it."""
+        # Short-lived connections keep the store safe to use from worker threads
+        conn = sqlite3.connect(self.metadata_path, timeout=10.0)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _compact(self):
+        """Reclaim space left by removed documents once free pages exceed METADATA_COMPACT_RATIO."""
+        with self._connect() as conn:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            total_pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            if total_pages and free_pages / total_pages > METADATA_COMPACT_RATIO:
+                conn.execute("VACUUM")
+                logger.info(f"✓ Compacted metadata store ({free_pages}/{total_pages} pages free)")
+
     def _ensure_metadata_file(self):
-        """Ensure metadata file exists with version."""
+        """Ensure metadata database exists, importing a legacy metadata.json once."""
         self.store_path.mkdir(parents=True, exist_ok=True)
-        if not self.metadata_path.exists():
-            initial_data = {"schema_version": str(self.schema_version), "documents": {}}
-            with open(self.metadata_path, "w", encoding="utf-8") as f:
-                json.dump(initial_data, f, indent=2, ensure_ascii=False, cls=DateTimeEncoder)
-        else:
-            # Load and validate existing metadata
-            try:
-                with open(self.metadata_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if "documents" not in data:
-                    data["documents"] = {}
-                    with open(self.metadata_path, "w", encoding="utf-8") as f:
-                        json.dump(data, f, indent=2, ensure_ascii=False, cls=DateTimeEncoder)
-            except Exception as e:
-                logger.error(f"Error validating metadata file: {str(e)}")
-                # Create new metadata file
-                initial_data = {"schema_version": str(self.schema_version), "documents": {}}
-                with open(self.metadata_path, "w", encoding="utf-8") as f:
-                    json.dump(initial_data, f, indent=2, ensure_ascii=False, cls=DateTimeEncoder)
+        is_new = not self.metadata_path.exists()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " file_path TEXT PRIMARY KEY, schema_version TEXT, payload BLOB NOT NULL, updated_at REAL)"
+            )
+        if is_new and self.legacy_metadata_path.exists():
+            self._import_legacy_metadata()
+
+    def _import_legacy_metadata(self):
+        """Copy documents from a pre-SQLite metadata.json into the database."""
+        try:
+            # Parse straight from the page cache; legacy stores held every document in this one file
+            with open(self.legacy_metadata_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    data = orjson.loads(view)
+            schema = str(data.get("schema_version", self._schema_str))
+            now = time.time()
+            rows = [
+                (file_path, schema, orjson.dumps(document, option=JSON_OPTIONS), now)
+                for file_path, document in data.get("documents", {}).items()
+            ]
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)", rows)
+            logger.info(f"✓ Imported {len(rows)} documents from {self.legacy_metadata_path}")
+        except Exception as e:
+            logger.error(f"Error importing legacy metadata file: {str(e)}")
 
     async def consolidate_metadata_async(
         self,
@@ -74,50 +143,15 @@ class MetadataConsolidator:
     ) -> DocumentMetadata:
         """Asynchronously consolidate and validate metadata."""
         try:
-            # Start processing metadata
-            processing = ProcessingMetadata(started_at=datetime.now(), steps_completed=[], extraction_methods={})
-
-            # Create base metadata
-            doc_metadata = DocumentMetadata(
-                schema_version=self.schema_version,
-                file_path=str(file_path),
+            doc_metadata = self._build_metadata(
+                file_path=file_path,
                 file_hash=file_hash,
-                title=metadata.get("title", "") if metadata else "",
-                authors=[
-                    Author(**author) if isinstance(author, dict) else Author(full_name=author)
-                    for author in (metadata.get("authors", []) if metadata else [])
-                ],
-                abstract=metadata.get("abstract", "") if metadata else None,
-                year=metadata.get("year") if metadata else None,
-                processing=processing,
-                processing_status=ProcessingState.PROCESSING.value,
-            )
-
-            # Process components in parallel
-            await asyncio.gather(
-                self._process_identifier(doc_metadata, identifier_info),
-                self._process_references(doc_metadata, references),
-                self._process_equations(doc_metadata, equations),
-                self._process_citations(doc_metadata, citations),
-            )
-
-            # Validate consolidated metadata
-            validation_results = await self._validate_metadata(doc_metadata)
-            doc_metadata.validated = all(validation_results.values())
-            if not doc_metadata.validated:
-                doc_metadata.validation_errors.extend(
-                    f"{key} validation failed" for key, valid in validation_results.items() if not valid
-                )
-
-            # Update processing metadata
-            doc_metadata.processing.completed_at = datetime.now()
-            doc_metadata.processing.duration = (
-                doc_metadata.processing.completed_at - doc_metadata.processing.started_at
-            ).total_seconds()
-
-            # Set final status
-            doc_metadata.processing_status = (
-                ProcessingState.COMPLETED.value if doc_metadata.validated else ProcessingState.VALIDATION_FAILED.value
+                identifier_info=identifier_info,
+                metadata=metadata,
+                references=references,
+                equations=equations,
+                citations=citations,
+                errors=errors,
             )
 
             # Save consolidated metadata
@@ -129,6 +163,28 @@ class MetadataConsolidator:
             logger.error(f"Error consolidating metadata: {str(e)}")
             raise
 
+    async def consolidate_metadata_batch_async(
+        self, documents: List[Dict[str, Any]]
+    ) -> List[Optional[DocumentMetadata]]:
+        """Consolidate several documents and save them in a single transaction.
+
+        Each item holds the keyword arguments of consolidate_metadata_async. A
+        document that fails to build is logged and returned as None; the rest
+        are still saved.
+        """
+        built: List[Optional[DocumentMetadata]] = []
+        for document in documents:
+            try:
+                built.append(self._build_metadata(**document))
+            except Exception as e:
+                logger.error(f"Error consolidating metadata: {str(e)}")
+                built.append(None)
+
+        to_save = [doc_metadata for doc_metadata in built if doc_metadata is not None]
+        if to_save:
+            await to_thread(self._save_metadata_batch, to_save)
+        return built
+
     def consolidate_metadata(
         self,
         file_path: Path,
@@ -140,9 +196,9 @@ class MetadataConsolidator:
         citations: Optional[list] = None,
         errors: Optional[list] = None,
     ) -> DocumentMetadata:
-        """Synchronous wrapper for metadata consolidation."""
-        return asyncio.run(
-            self.consolidate_metadata_async(
+        """Synchronously consolidate and validate metadata, without an event loop."""
+        try:
+            doc_metadata = self._build_metadata(
                 file_path=file_path,
                 file_hash=file_hash,
                 identifier_info=identifier_info,
@@ -152,9 +208,75 @@ class MetadataConsolidator:
                 citations=citations,
                 errors=errors,
             )
+
+            # Save consolidated metadata
+            self._save_metadata(doc_metadata)
+
+            return doc_metadata
+
+        except Exception as e:
+            logger.error(f"Error consolidating metadata: {str(e)}")
+            raise
+
+    def _build_metadata(
+        self,
+        file_path: Path,
+        file_hash: str,
+        identifier_info: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        references: Optional[list] = None,
+        equations: Optional[list] = None,
+        citations: Optional[list] = None,
+        errors: Optional[list] = None,
+    ) -> DocumentMetadata:
+        """Build, process and validate document metadata; CPU-only, shared by both entry points."""
+        # Start processing metadata
+        processing = ProcessingMetadata(started_at=datetime.now(), steps_completed=[], extraction_methods={})
+
+        # Create base metadata
+        doc_metadata = DocumentMetadata(
+            schema_version=self.schema_version,
+            file_path=str(file_path),
+            file_hash=file_hash,
+            title=metadata.get("title", "") if metadata else "",
+            authors=[_to_author(author) for author in (metadata.get("authors", []) if metadata else [])],
+            abstract=metadata.get("abstract", "") if metadata else None,
+            year=metadata.get("year") if metadata else None,
+            processing=processing,
+            processing_status=ProcessingState.PROCESSING.label,
+        )
+
+        # Process components; these are CPU-only, so they run inline rather than as tasks
+        self._process_identifier(doc_metadata, identifier_info)
+        self._process_references(doc_metadata, references)
+        self._process_equations(doc_metadata, equations)
+        self._process_citations(doc_metadata, citations)
+
+        # Cross-check citations against references once, now that both are assembled
+        doc_metadata.validation_errors.extend(doc_metadata.check_consistency())
+
+        # Validate consolidated metadata
+        validation_results = self._validate_metadata(doc_metadata)
+        doc_metadata.validated = all(validation_results.values())
+        if not doc_metadata.validated:
+            doc_metadata.validation_errors.extend(
+                f"{key} validation failed" for key, valid in validation_results.items() if not valid
+            )
+
+        # Update processing metadata
+        doc_metadata.processing.completed_at = datetime.now()
+        doc_metadata.processing.duration = (
+            doc_metadata.processing.completed_at - doc_metadata.processing.started_at
+        ).total_seconds()
+
+        # Set final status
+        doc_metadata.processing_status = (
+            ProcessingState.COMPLETED.label if doc_metadata.validated else ProcessingState.VALIDATION_FAILED.label
         )
 
-    async def _process_identifier(self, metadata: DocumentMetadata, identifier_info: Optional[Dict[str, Any]]):
+        return doc_metadata
+
+    def _process_identifier(self, metadata: DocumentMetadata, identifier_info: Optional[Dict[str, Any]]):
         """Process identifier information."""
         if identifier_info:
             metadata.identifier = identifier_info.get("identifier")
@@ -162,80 +284,60 @@ class MetadataConsolidator:
             metadata.processing.extraction_methods["identifier"] = identifier_info.get("method", "unknown")
             metadata.processing.steps_completed.append("identifier_extraction")
 
-    async def _process_references(self, metadata: DocumentMetadata, references: Optional[list]):
+    def _process_references(self, metadata: DocumentMetadata, references: Optional[list]):
         """Process and validate references."""
         if references:
-            processed_refs = []
-            for ref in references:
-                if isinstance(ref, dict):
-                    # Generate reference ID if not present
-                    if "reference_id" not in ref:
-                        ref["reference_id"] = f"ref_{len(processed_refs) + 1}"
-                    processed_refs.append(Reference.model_validate(ref))
-                elif hasattr(ref, "model_dump"):  # Handle existing Reference objects
-                    processed_refs.append(ref)
-            metadata.references = processed_refs
+            kept = [ref for ref in references if isinstance(ref, dict) or hasattr(ref, "model_dump")]
+            for i, ref in enumerate(kept, 1):
+                # Generate reference ID if not present
+                if isinstance(ref, dict) and "reference_id" not in ref:
+                    ref["reference_id"] = f"ref_{i}"
+            metadata.references = validate_list(REFERENCE_LIST_ADAPTER, kept)
             metadata.processing.steps_completed.append("reference_extraction")
 
-    async def _process_equations(self, metadata: DocumentMetadata, equations: Optional[list]):
+    def _process_equations(self, metadata: DocumentMetadata, equations: Optional[list]):
         """Process and validate equations."""
         if equations:
-            processed_eqs = []
-            for eq in equations:
-                if isinstance(eq, dict):
-                    # Process symbols if present
-                    if "symbols" in eq and isinstance(eq["symbols"], list):
-                        eq["symbols"] = [
-                            Symbol.model_validate(sym) if isinstance(sym, dict) else Symbol(symbol=sym)
-                            for sym in eq["symbols"]
-                        ]
-                    processed_eqs.append(Equation.model_validate(eq))
-                elif hasattr(eq, "model_dump"):  # Handle existing Equation objects
-                    processed_eqs.append(eq)
-            metadata.equations = processed_eqs
+            # Nested symbol dicts are validated along with their equation
+            kept = [eq for eq in equations if isinstance(eq, dict) or hasattr(eq, "model_dump")]
+            metadata.equations = validate_list(EQUATION_LIST_ADAPTER, kept)
             metadata.processing.steps_completed.append("equation_extraction")
 
-    async def _process_citations(self, metadata: DocumentMetadata, citations: Optional[list]):
+    def _process_citations(self, metadata: DocumentMetadata, citations: Optional[list]):
         """Process and validate citations."""
         if citations:
-            processed_cits = []
-            for cit in citations:
-                if isinstance(cit, dict):
-                    processed_cits.append(Citation.model_validate(cit))
-                elif hasattr(cit, "model_dump"):  # Handle existing Citation objects
-                    processed_cits.append(cit)
-            metadata.citations = processed_cits
+            kept = [cit for cit in citations if isinstance(cit, dict) or hasattr(cit, "model_dump")]
+            metadata.citations = validate_list(CITATION_LIST_ADAPTER, kept)
             metadata.processing.steps_completed.append("citation_extraction")
 
-    async def _validate_metadata(self, metadata: DocumentMetadata) -> Dict[str, bool]:
+    def _validate_metadata(self, metadata: DocumentMetadata) -> Dict[str, bool]:
         """Validate metadata components."""
         validation_results = {
-            "basic_metadata": await self._validate_basic_metadata(metadata),
-            "references": await self._validate_references(metadata),
-            "equations": await self._validate_equations(metadata),
-            "citations": await self._validate_citations(metadata),
+            "basic_metadata": self._validate_basic_metadata(metadata),
+            "references": self._validate_references(metadata),
+            "equations": self._validate_equations(metadata),
+            "citations": self._validate_citations(metadata),
         }
         metadata.processing.validation_results = validation_results
         return validation_results
 
-    async def _validate_basic_metadata(self, metadata: DocumentMetadata) -> bool:
+    def _validate_basic_metadata(self, metadata: DocumentMetadata) -> bool:
         """Validate basic metadata fields."""
         return all([metadata.file_path, metadata.file_hash, metadata.title, len(metadata.authors) > 0])
 
-    async def _validate_references(self, metadata: DocumentMetadata) -> bool:
+    def _validate_references(self, metadata: DocumentMetadata) -> bool:
         """Validate references."""
         if not metadata.references:
             return True
 
         return all(
-            ref.title
-            or ref.raw_text  # Must have either title or raw text
-            and len(ref.authors) > 0  # Must have at least one author
+            (ref.title or ref.raw_text)  # Must have either title or raw text
+            and ref.authors  # Must have at least one author
             and ref.reference_id  # Must have reference ID
             for ref in metadata.references
         )
 
-    async def _validate_equations(self, metadata: DocumentMetadata) -> bool:
+    def _validate_equations(self, metadata: DocumentMetadata) -> bool:
         """Validate equations."""
         if not metadata.equations:
             return True
@@ -250,13 +352,13 @@ class MetadataConsolidator:
             for eq in metadata.equations
         )
 
-    async def _validate_citations(self, metadata: DocumentMetadata) -> bool:
+    def _validate_citations(self, metadata: DocumentMetadata) -> bool:
         """Validate citations."""
         if not metadata.citations:
             return True
 
-        # Build reference ID set
-        ref_ids = {ref.reference_id for ref in metadata.references}
+        # Build reference ID set once; each citation is then a hash lookup
+        ref_ids = frozenset(ref.reference_id for ref in metadata.references)
 
         return all(
             cit.text  # Must have text
@@ -267,19 +369,37 @@ class MetadataConsolidator:
 
     async def _save_metadata_async(self, metadata: DocumentMetadata):
         """Save metadata asynchronously."""
-        try:
-            # Load existing metadata
-            current_metadata = await self._load_metadata_async()
-
-            # Update with new metadata
-            current_metadata["documents"][str(metadata.file_path)] = metadata.model_dump()
-            current_metadata["schema_version"] = str(self.schema_version)
+        await to_thread(self._save_metadata, metadata)
 
-            # Save back to file
-            async with aiofiles.open(self.metadata_path, "w", encoding="utf-8") as f:
-                await f.write(json.dumps(current_metadata, indent=2, ensure_ascii=False, cls=DateTimeEncoder))
+    def _save_metadata(self, metadata: DocumentMetadata):
+        """Insert or replace the row for one document."""
+        self._save_metadata_batch([metadata])
 
-            logger.info(f"✓ Metadata saved for {metadata.file_path}")
+    def _save_metadata_batch(self, documents: List[DocumentMetadata]):
+        """Insert or replace the rows for several documents in one transaction."""
+        try:
+            # Serialize straight from the model in pydantic's core, no intermediate dict
+            payloads = [metadata.model_dump_json_cached() for metadata in documents]
+            now = time.time()
+            with self._cache_lock:
+                with self._connect() as conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                        [
+                            (metadata.file_path, self._schema_str, payload, now)
+                            for metadata, payload in zip(documents, payloads, strict=True)
+                        ],
+                    )
+                # Write through so a warm cache stays valid
+                if self._cache is not None:
+                    for metadata, payload in zip(documents, payloads, strict=True):
+                        self._cache[metadata.file_path] = orjson.loads(payload)
+                    self._cache_stamp = self._store_stamp()
+
+            if len(documents) == 1:
+                logger.info(f"✓ Metadata saved for {documents[0].file_path}")
+            else:
+                logger.info(f"✓ Metadata saved for {len(documents)} documents")
 
         except Exception as e:
             logger.error(f"Error saving metadata: {str(e)}")
@@ -287,45 +407,63 @@ class MetadataConsolidator:
 
     async def _load_metadata_async(self) -> Dict[str, Any]:
         """Load metadata asynchronously."""
+        return await to_thread(self._load_metadata)
+
+    def count_metadata(self) -> int:
+        """Count stored documents without loading their payloads."""
         try:
-            async with aiofiles.open(self.metadata_path, "r", encoding="utf-8") as f:
-                content = await f.read()
-                data = json.loads(content)
-                if "documents" not in data:
-                    data["documents"] = {}
-                return data
+            with self._connect() as conn:
+                return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
         except Exception as e:
-            logger.error(f"Error loading metadata: {str(e)}")
-            return {"schema_version": str(self.schema_version), "documents": {}}
+            logger.error(f"Error counting metadata: {str(e)}")
+            return 0
 
     def get_metadata(self, file_path: Path) -> Optional[DocumentMetadata]:
         """Get metadata for a specific file."""
-        metadata_dict = self._load_metadata().get("documents", {}).get(str(file_path))
-        if metadata_dict:
-            return DocumentMetadata.model_validate(metadata_dict)
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT payload FROM documents WHERE file_path = ?", (str(file_path),)).fetchone()
+        except Exception as e:
+            logger.error(f"Error loading metadata: {str(e)}")
+            return None
+
+        if row:
+            # Parse and validate the stored JSON in one pass in pydantic's core
+            return DocumentMetadata.model_validate_json(row[0])
         return None
 
     def remove_metadata(self, file_path: Path):
         """Remove metadata for a specific file."""
         try:
-            current_metadata = self._load_metadata()
-            if str(file_path) in current_metadata.get("documents", {}):
-                del current_metadata["documents"][str(file_path)]
-                with open(self.metadata_path, "w", encoding="utf-8") as f:
-                    json.dump(current_metadata, f, indent=2, ensure_ascii=False, cls=DateTimeEncoder)
+            with self._cache_lock:
+                with self._connect() as conn:
+                    removed = conn.execute("DELETE FROM documents WHERE file_path = ?", (str(file_path),)).rowcount
+                if self._cache is not None:
+                    self._cache.pop(str(file_path), None)
+                    self._cache_stamp = self._store_stamp()
+            if removed:
                 logger.info(f"✓ Metadata removed for {file_path}")
+                self._compact()
         except Exception as e:
             logger.error(f"Error removing metadata: {str(e)}")
             raise
 
     def _load_metadata(self) -> Dict[str, Any]:
-        """Synchronous metadata loading."""
+        """Synchronous metadata loading.
+
+        Documents are parsed once and reused until the database changes on disk;
+        the returned document dicts are shared and should be treated as read-only.
+        """
         try:
-            with open(self.metadata_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if "documents" not in data:
-                    data["documents"] = {}
-                return data
+            with self._cache_lock:
+                stamp = self._store_stamp()
+                if self._cache is None or stamp != self._cache_stamp:
+                    with self._connect() as conn:
+                        rows = conn.execute("SELECT file_path, payload FROM documents").fetchall()
+                    self._cache = {file_path: orjson.loads(payload) for file_path, payload in rows}
+                    self._cache_stamp = stamp
+                documents = dict(self._cache)
+            return {"schema_version": self._schema_str, "documents": documents}
         except Exception as e:
             logger.error(f"Error loading metadata: {str(e)}")
-            return {"schema_version": str(self.schema_version), "documents": {}}
+            return {"schema_version": self._schema_str, "documents": {}}
@@ -2,9 +2,14 @@
 
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter, computed_field, field_validator
+
+# Identifier formats checked by Reference validators, matched at the start of the value
+DOI_PATTERN = re.compile(r"10\.\d{4,9}/[-._;()/:\w]+")
+ARXIV_PATTERN = re.compile(r"\d{4}\.\d{4,5}(v\d+)?")
 
 
 class SchemaVersion(BaseModel):
@@ -21,11 +26,13 @@ class SchemaVersion(BaseModel):
 class Author(BaseModel):
     """Author model with name components."""
 
-    model_config = ConfigDict(validate_assignment=True)
+    # Frozen to reject accidental mutation and make authors hashable; it does not shrink instances
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
 
     full_name: str
-    given: Optional[str] = None
-    family: Optional[str] = None
+    # Components passed in explicitly; when both are missing, given/family split full_name on first access
+    given_name: Optional[str] = Field(default=None, validation_alias="given", exclude=True, repr=False)
+    family_name: Optional[str] = Field(default=None, validation_alias="family", exclude=True, repr=False)
 
     @field_validator("full_name")
     @classmethod
@@ -34,22 +41,29 @@ class Author(BaseModel):
             raise ValueError("Author name cannot be empty")
         return v.strip()
 
-    @model_validator(mode="after")
-    def parse_name_components(self) -> "Author":
-        """Parse name components if not provided."""
-        if not self.given and not self.family:
-            parts = self.full_name.split(" ")
-            if len(parts) > 1:
-                self.family = parts[-1]
-                self.given = " ".join(parts[:-1])
-        return self
+    @computed_field
+    @cached_property
+    def given(self) -> Optional[str]:
+        return self._name_components()[0]
+
+    @computed_field
+    @cached_property
+    def family(self) -> Optional[str]:
+        return self._name_components()[1]
+
+    def _name_components(self) -> Tuple[Optional[str], Optional[str]]:
+        """Return (given, family), parsing full_name if neither was provided."""
+        if self.given_name or self.family_name:
+            return self.given_name, self.family_name
+        parts = self.full_name.split(" ")
+        if len(parts) > 1:
+            return " ".join(parts[:-1]), parts[-1]
+        return None, None
 
 
 class Citation(BaseModel):
     """Citation model for tracking in-text citations."""
 
-    model_config = ConfigDict(validate_assignment=True)
-
     text: str
     context: str
     citation_type: str = Field(default="numeric", description="Type of citation (numeric or author-year)")
@@ -83,26 +97,22 @@ class Reference(BaseModel):
     @field_validator("doi")
     @classmethod
     def validate_doi(cls, v: Optional[str]) -> Optional[str]:
-        if v:
-            doi_pattern = r"10.\d{4,9}/[-._;()/:\w]+"
-            if not re.match(doi_pattern, v):
-                raise ValueError("Invalid DOI format")
+        if v and not DOI_PATTERN.match(v):
+            raise ValueError("Invalid DOI format")
         return v
 
     @field_validator("arxiv_id")
     @classmethod
     def validate_arxiv(cls, v: Optional[str]) -> Optional[str]:
-        if v:
-            arxiv_pattern = r"\d{4}\.\d{4,5}(v\d+)?"
-            if not re.match(arxiv_pattern, v):
-                raise ValueError("Invalid arXiv ID format")
+        if v and not ARXIV_PATTERN.match(v):
+            raise ValueError("Invalid arXiv ID format")
         return v
 
 
 class Symbol(BaseModel):
     """Mathematical symbol with context."""
 
-    model_config = ConfigDict(validate_assignment=True)
+    model_config = ConfigDict(frozen=True)
 
     symbol: str
     type: str  # greek, operator, variable, etc.
@@ -113,8 +123,6 @@ class Symbol(BaseModel):
 class Equation(BaseModel):
     """Enhanced equation model."""
 
-    model_config = ConfigDict(validate_assignment=True)
-
     content: str
     context: Optional[str] = None
     symbols: List[Symbol] = Field(default_factory=list)
@@ -135,8 +143,6 @@ class Equation(BaseModel):
 class ProcessingMetadata(BaseModel):
     """Track processing details."""
 
-    model_config = ConfigDict(validate_assignment=True)
-
     started_at: datetime = Field(default_factory=datetime.now)
     completed_at: Optional[datetime] = None
     duration: Optional[float] = None
@@ -179,6 +185,26 @@ class DocumentMetadata(BaseModel):
     validated: bool = False
     validation_errors: List[str] = Field(default_factory=list)
 
+    # JSON dump shared by the metadata and LightRAG stores; cleared when a field is reassigned
+    _json_cache: Optional[bytes] = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in DocumentMetadata.model_fields:
+            self._json_cache = None
+
+    # model_copy copies private attributes and applies updates without __setattr__,
+    # so copies start without the source's dump
+    def __copy__(self) -> "DocumentMetadata":
+        copied = super().__copy__()
+        copied._json_cache = None
+        return copied
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> "DocumentMetadata":
+        copied = super().__deepcopy__(memo)
+        copied._json_cache = None
+        return copied
+
     @field_validator("year")
     @classmethod
     def validate_year(cls, v: Optional[int]) -> Optional[int]:
@@ -188,47 +214,72 @@ class DocumentMetadata(BaseModel):
                 raise ValueError(f"Year must be between 1800 and {current_year + 1}")
         return v
 
-    @model_validator(mode="after")
-    def validate_references_citations(self) -> "DocumentMetadata":
-        """Ensure citations match references."""
-        # Build reference ID set
+    def check_consistency(self) -> List[str]:
+        """Return errors for citations that point at no known reference."""
         ref_ids = {ref.reference_id for ref in self.references if ref.reference_id}
-
-        # Validate citations
-        for citation in self.citations:
-            if citation.reference_id not in ref_ids:
-                self.validation_errors.append(f"Citation references non-existent reference ID: {citation.reference_id}")
-
-        return self
+        return [
+            f"Citation references non-existent reference ID: {citation.reference_id}"
+            for citation in self.citations
+            if citation.reference_id not in ref_ids
+        ]
+
+    def model_dump_json_cached(self) -> bytes:
+        """Return the JSON dump as UTF-8 bytes, serializing only if no dump is cached.
+
+        The bytes come straight from pydantic's serializer, with no intermediate str.
+        In-place edits of nested models or lists do not clear the cache.
+        """
+        if self._json_cache is None:
+            self._json_cache = self.__pydantic_serializer__.to_json(self)
+        return self._json_cache
 
     def to_store_format(self) -> Dict[str, Any]:
         """Convert metadata to format suitable for store."""
+        # Dump the tree once and project the store fields from the dumped subtrees
+        dumped = self.model_dump()
         return {
             "schema_version": str(self.schema_version),
-            "title": self.title,
-            "authors": [author.full_name for author in self.authors],
-            "abstract": self.abstract or "",
-            "year": self.year,
+            "title": dumped["title"],
+            "authors": [author["full_name"] for author in dumped["authors"]],
+            "abstract": dumped["abstract"] or "",
+            "year": dumped["year"],
             "references": [
                 {
-                    "title": ref.title,
-                    "authors": [a.full_name for a in ref.authors],
-                    "year": ref.year,
-                    "doi": ref.doi,
-                    "arxiv_id": ref.arxiv_id,
+                    "title": ref["title"],
+                    "authors": [a["full_name"] for a in ref["authors"]],
+                    "year": ref["year"],
+                    "doi": ref["doi"],
+                    "arxiv_id": ref["arxiv_id"],
                 }
-                for ref in self.references
-                if ref.title
+                for ref in dumped["references"]
+                if ref["title"]
             ],
             "equations": [
-                {"content": eq.content, "type": eq.equation_type, "symbols": [s.symbol for s in eq.symbols]}
-                for eq in self.equations
+                {"content": eq["content"], "type": eq["equation_type"], "symbols": [s["symbol"] for s in eq["symbols"]]}
+                for eq in dumped["equations"]
             ],
             "citations": [
-                {"text": cit.text, "reference_id": cit.reference_id, "type": cit.citation_type}
-                for cit in self.citations
+                {"text": cit["text"], "reference_id": cit["reference_id"], "type": cit["citation_type"]}
+                for cit in dumped["citations"]
             ],
-            "processing_status": self.processing_status,
-            "validated": self.validated,
-            "metadata": self.model_dump(),
+            "processing_status": dumped["processing_status"],
+            "validated": dumped["validated"],
+            "metadata": dumped,
         }
+
+
+# List validators: one pydantic call per list instead of one per item
+REFERENCE_LIST_ADAPTER = TypeAdapter(List[Reference])
+EQUATION_LIST_ADAPTER = TypeAdapter(List[Equation])
+CITATION_LIST_ADAPTER = TypeAdapter(List[Citation])
+
+
+def validate_list(adapter: TypeAdapter, items: List[Any]) -> List[Any]:
+    """Validate the dict items of a list in one adapter call; model instances pass through in place."""
+    positions = [i for i, item in enumerate(items) if isinstance(item, dict)]
+    if not positions:
+        return list(items)
+    validated = list(items)
+    for i, model in zip(positions, adapter.validate_python([items[i] for i in positions]), strict=True):
+        validated[i] = model
+    return validated
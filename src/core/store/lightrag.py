@@ -1,28 +1,54 @@
 """LightRAG store implementation for document management."""
 
 import asyncio
+import threading
 from functools import wraps
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
+import orjson
 
 from ...utils.constants import (
     DEFAULT_EMBEDDING_DIM,
     DEFAULT_STORE_PATH,
+    EMBEDDING_BACKEND,
+    EMBEDDING_BACKENDS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_ONNX_FILE,
     ERROR_MESSAGES,
     SUCCESS_MESSAGES,
 )
+from ...utils.event_loop import run_sync, to_thread
 from ...utils.logger import logger
 from ..metadata.models import DocumentMetadata
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
-def create_embedding_function(model: SentenceTransformer) -> Callable:
+
+def load_embedding_model(backend: str = EMBEDDING_BACKEND) -> "SentenceTransformer":
+    """Load the embedding model with the given backend: "torch" (fp32) or "onnx" (int8-quantized export)."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Embedding backend must be one of {EMBEDDING_BACKENDS}, got {backend!r}")
+
+    # Imported here: torch and transformers take seconds to load and callers with their own embedding_func skip them
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        return SentenceTransformer(
+            EMBEDDING_MODEL_NAME, backend="onnx", model_kwargs={"file_name": EMBEDDING_ONNX_FILE}
+        )
+    return SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+
+def create_embedding_function(model: "SentenceTransformer") -> Callable:
     """Create an embedding function with the correct attributes."""
 
     @wraps(model.encode)
-    def embedding_func(text: str) -> Any:
-        return model.encode(text)
+    def embedding_func(texts: List[str], batch_size: int = EMBEDDING_BATCH_SIZE) -> Any:
+        return model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
 
     # Add required attributes
     embedding_func.embedding_dim = model.get_sentence_embedding_dimension()
@@ -38,53 +64,100 @@ class LightRAGStore:
         embedding_dim: int = DEFAULT_EMBEDDING_DIM,
         llm_model_func: Optional[Any] = None,
         embedding_func: Optional[Any] = None,
+        embedding_backend: str = EMBEDDING_BACKEND,
     ):
-        """Initialize LightRAG store."""
+        """Initialize LightRAG store.
+
+        Without an embedding_func the store loads its own model with embedding_backend,
+        which must match the backend recorded when the store was first used.
+        """
         self.store_path = store_path / "lightrag"
         self.store_path.mkdir(parents=True, exist_ok=True)
 
-        # Create store subdirectories
-        (self.store_path / "documents").mkdir(exist_ok=True)
-        (self.store_path / "vectors").mkdir(exist_ok=True)
-        (self.store_path / "metadata").mkdir(exist_ok=True)
+        # Create store subdirectories, keeping their paths for per-document joins
+        self._docs_dir = self.store_path / "documents"
+        self._vecs_dir = self.store_path / "vectors"
+        self._meta_dir = self.store_path / "metadata"
+        for directory in (self._docs_dir, self._vecs_dir, self._meta_dir):
+            directory.mkdir(exist_ok=True)
 
         # Initialize embedding model if not provided
         if embedding_func is None:
-            self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+            self._check_embedding_backend(embedding_backend)
+            self.embedding_model = load_embedding_model(embedding_backend)
             embedding_func = create_embedding_function(self.embedding_model)
 
         self.embedding_func = embedding_func
         self.embedding_dim = embedding_dim
         self.llm_model_func = llm_model_func
 
-    async def add_document_async(self, metadata: Union[Dict[str, Any], DocumentMetadata]) -> bool:
+        # Document count, scanned once here and kept current by add and remove
+        self._doc_count = sum(1 for _ in self._docs_dir.glob("*.txt"))
+        self._doc_count_lock = threading.Lock()
+
+    def _check_embedding_backend(self, backend: str) -> None:
+        """Record the store's embedding model and backend, refusing to open it with a different one."""
+        config_path = self.store_path / "embedding.json"
+        config = {"model": EMBEDDING_MODEL_NAME, "backend": backend}
+        if config_path.exists():
+            recorded = orjson.loads(config_path.read_bytes())
+            if recorded != config:
+                raise ValueError(f"Store at {self.store_path} was embedded with {recorded}, not {config}")
+        else:
+            config_path.write_bytes(orjson.dumps(config))
+
+    async def add_document_async(self, metadata: DocumentMetadata) -> bool:
         """Add document to store using metadata asynchronously."""
+        results = await self.add_documents_async([metadata])
+        return results[0]
+
+    async def add_documents_async(self, metadatas: List[DocumentMetadata]) -> List[bool]:
+        """Add documents to store, embedding all their texts in one batched call."""
+        results = [False] * len(metadatas)
+        prepared = []
+        for i, metadata in enumerate(metadatas):
+            try:
+                prepared.append((i, await self._prepare_store_data_async(metadata)))
+            except Exception as e:
+                logger.error(ERROR_MESSAGES["store_error"].format(error=str(e)))
+
+        if not prepared:
+            return results
+
         try:
-            # Convert metadata to store format if needed
-            if isinstance(metadata, DocumentMetadata):
-                store_data = await self._prepare_store_data_async(metadata)
-            else:
-                # If it's already a dict, assume it's in the correct format
-                store_data = await self._prepare_store_data_async(DocumentMetadata.model_validate(metadata))
+            # Generate embeddings for every document in one encoder call
+            texts = [store_data["text"] for _, store_data in prepared]
+            embeddings = await to_thread(self.embedding_func, texts)
+            if len(embeddings) != len(texts):
+                raise ValueError(f"embedding function returned {len(embeddings)} vectors for {len(texts)} texts")
+        except Exception as e:
+            logger.error(ERROR_MESSAGES["store_error"].format(error=str(e)))
+            return results
 
+        for (i, store_data), embedding in zip(prepared, embeddings, strict=True):
+            results[i] = await self._write_document_async(store_data, embedding)
+        return results
+
+    async def _write_document_async(self, store_data: Dict[str, Any], embedding: Any) -> bool:
+        """Write one document's text, embedding and metadata files."""
+        try:
             # Save document content
-            doc_path = self.store_path / "documents" / f"{store_data['id']}.txt"
-            async with asyncio.Lock():
-                with open(doc_path, "w", encoding="utf-8") as f:
-                    f.write(store_data["text"])
-
-            # Generate and save embeddings
-            embeddings = await asyncio.to_thread(self.embedding_func, [store_data["text"]])
-            vec_path = self.store_path / "vectors" / f"{store_data['id']}.npy"
-            async with asyncio.Lock():
-                with open(vec_path, "wb") as f:
-                    embeddings.tofile(f)
+            doc_path = self._docs_dir / f"{store_data['id']}.txt"
+            is_new = not doc_path.exists()
+            await to_thread(doc_path.write_text, store_data["text"], encoding="utf-8")
+            if is_new:
+                with self._doc_count_lock:
+                    self._doc_count += 1
+
+            # Save embeddings as half-precision .npy so shape and dtype survive and files can be memory-mapped
+            vec_path = self._vecs_dir / f"{store_data['id']}.npy"
+            await to_thread(
+                np.save, vec_path, np.asarray(embedding).astype(np.float16, copy=False), allow_pickle=False
+            )
 
             # Save metadata
-            meta_path = self.store_path / "metadata" / f"{store_data['id']}.json"
-            async with asyncio.Lock():
-                with open(meta_path, "w", encoding="utf-8") as f:
-                    f.write(store_data["metadata"])
+            meta_path = self._meta_dir / f"{store_data['id']}.json"
+            await to_thread(meta_path.write_bytes, store_data["metadata"].model_dump_json_cached())
 
             logger.info(SUCCESS_MESSAGES["store_update"])
             return True
@@ -93,34 +166,60 @@ class LightRAGStore:
             logger.error(ERROR_MESSAGES["store_error"].format(error=str(e)))
             return False
 
-    def add_document(self, metadata: Union[Dict[str, Any], DocumentMetadata]) -> bool:
+    def has_document(self, doc_id: str) -> bool:
+        """Return whether the text, embedding and metadata files of a document were all written."""
+        return all(
+            path.exists()
+            for path in (
+                self._docs_dir / f"{doc_id}.txt",
+                self._vecs_dir / f"{doc_id}.npy",
+                self._meta_dir / f"{doc_id}.json",
+            )
+        )
+
+    def add_document(self, metadata: DocumentMetadata) -> bool:
         """Synchronous wrapper for adding document."""
-        return asyncio.run(self.add_document_async(metadata))
+        return run_sync(self.add_document_async(metadata))
+
+    def add_documents(self, metadatas: List[DocumentMetadata]) -> List[bool]:
+        """Synchronous wrapper for adding documents."""
+        return run_sync(self.add_documents_async(metadatas))
 
-    async def remove_document_async(self, file_path: str) -> bool:
-        """Remove document from store asynchronously."""
+    async def remove_document_async(self, doc_id: str) -> bool:
+        """Remove a document, stored under its file hash, from the store asynchronously."""
         try:
-            doc_id = Path(file_path).stem
             paths = [
-                self.store_path / "documents" / f"{doc_id}.txt",
-                self.store_path / "vectors" / f"{doc_id}.npy",
-                self.store_path / "metadata" / f"{doc_id}.json",
+                self._docs_dir / f"{doc_id}.txt",
+                self._vecs_dir / f"{doc_id}.npy",
+                self._meta_dir / f"{doc_id}.json",
             ]
 
-            for path in paths:
-                if path.exists():
-                    path.unlink()
+            # Unlink all three files concurrently; a missing file is skipped rather than pre-checked
+            removed = await asyncio.gather(*(to_thread(self._safe_unlink, path) for path in paths))
+            # Only a deleted text file was counted, so a missing document leaves the count alone
+            if removed[0]:
+                with self._doc_count_lock:
+                    self._doc_count -= 1
 
-            logger.info(f"✓ Document removed from store: {file_path}")
+            logger.info(f"✓ Document removed from store: {doc_id}")
             return True
 
         except Exception as e:
             logger.error(ERROR_MESSAGES["store_error"].format(error=str(e)))
             return False
 
-    def remove_document(self, file_path: str) -> bool:
+    @staticmethod
+    def _safe_unlink(path: Path) -> bool:
+        """Delete path, returning False if it did not exist."""
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def remove_document(self, doc_id: str) -> bool:
         """Synchronous wrapper for removing document."""
-        return asyncio.run(self.remove_document_async(file_path))
+        return run_sync(self.remove_document_async(doc_id))
 
     async def search_async(
         self, query: str, mode: str = "hybrid", max_results: int = 5, include_metadata: bool = True
@@ -128,7 +227,7 @@ class LightRAGStore:
         """Search store with query asynchronously."""
         try:
             # Generate query embedding
-            query_embedding = await asyncio.to_thread(self.embedding_func, [query])
+            query_embedding = await to_thread(self.embedding_func, [query])
 
             # TODO: Implement actual search logic
             # For now, return empty results
@@ -142,44 +241,44 @@ class LightRAGStore:
         self, query: str, mode: str = "hybrid", max_results: int = 5, include_metadata: bool = True
     ) -> Dict[str, Any]:
         """Synchronous wrapper for search."""
-        return asyncio.run(
+        return run_sync(
             self.search_async(query=query, mode=mode, max_results=max_results, include_metadata=include_metadata)
         )
 
     async def get_stats_async(self) -> Dict[str, Any]:
         """Get store statistics asynchronously."""
         try:
-            doc_count = len(list((self.store_path / "documents").glob("*.txt")))
-            return {"document_count": doc_count, "store_path": str(self.store_path)}
+            return {"document_count": self._doc_count, "store_path": str(self.store_path)}
         except Exception as e:
             logger.error(ERROR_MESSAGES["store_error"].format(error=str(e)))
             return {}
 
     def get_stats(self) -> Dict[str, Any]:
         """Synchronous wrapper for getting stats."""
-        return asyncio.run(self.get_stats_async())
+        return run_sync(self.get_stats_async())
 
     async def _prepare_store_data_async(self, metadata: DocumentMetadata) -> Dict[str, Any]:
         """Prepare metadata for store insertion asynchronously."""
-        # Combine relevant fields for text content
+        # Combine relevant fields for text content; join builds a list from generators anyway, so pass lists
         content_parts = [
             metadata.title,
             metadata.abstract or "",
             # References
-            "\n".join(ref.title or ref.raw_text or "" for ref in metadata.references),
+            "\n".join([ref.title or ref.raw_text or "" for ref in metadata.references]),
             # Equations with context
-            "\n".join(f"{eq.content} - {eq.context or ''}" for eq in metadata.equations),
+            "\n".join([f"{eq.content} - {eq.context or ''}" for eq in metadata.equations]),
             # Citations with context
-            "\n".join(f"{cit.text} - {cit.context or ''}" for cit in metadata.citations),
+            "\n".join([f"{cit.text} - {cit.context or ''}" for cit in metadata.citations]),
         ]
 
-        # Join with newlines and add metadata
+        # Strip each section once, then join the non-empty ones with blank lines; metadata is serialized when written
+        sections = [part.strip() for part in content_parts]
         return {
             "id": metadata.file_hash,
-            "text": "\n\n".join(part.strip() for part in content_parts if part.strip()),
-            "metadata": metadata.model_dump_json(),
+            "text": "\n\n".join([section for section in sections if section]),
+            "metadata": metadata,
         }
 
     def _prepare_store_data(self, metadata: DocumentMetadata) -> Dict[str, Any]:
         """Synchronous wrapper for preparing store data."""
-        return asyncio.run(self._prepare_store_data_async(metadata))
+        return run_sync(self._prepare_store_data_async(metadata))
@@ -1,9 +1,9 @@
 """High-level store management operations."""
-import asyncio
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from ...utils.constants import DEFAULT_STORE_PATH
+from ...utils.event_loop import run_sync, to_thread
 from ...utils.logger import logger
 from ..metadata.consolidator import MetadataConsolidator
 from ..metadata.models import DocumentMetadata
@@ -34,51 +34,71 @@ class StoreManager:
         metadata: Dict[str, Any]
     ) -> bool:
         """Add document to both metadata store and LightRAG asynchronously."""
-        try:
-            # First save to metadata store
-            doc_metadata = await self.metadata_consolidator.consolidate_metadata_async(
-                file_path=file_path,
-                file_hash=metadata.get('file_hash', ''),
-                identifier_info=metadata.get('identifier_info'),
-                metadata=metadata.get('metadata'),
-                references=metadata.get('references'),
-                equations=metadata.get('equations'),
-                citations=metadata.get('citations'),
-                errors=metadata.get('errors')
-            )
+        results = await self.add_documents_async([(file_path, metadata)])
+        return results[0]
 
-            # Then add to LightRAG store
-            store_success = await asyncio.to_thread(
-                self.lightrag_store.add_document,
-                doc_metadata.model_dump()
-            )
+    async def add_documents_async(
+        self,
+        documents: List[Tuple[Path, Dict[str, Any]]]
+    ) -> List[bool]:
+        """Add documents to both stores, flushing them to LightRAG in one batch."""
+        results = [False] * len(documents)
+        try:
+            # First save to metadata store, all documents in one transaction
+            built = await self.metadata_consolidator.consolidate_metadata_batch_async([
+                {
+                    'file_path': file_path,
+                    'file_hash': metadata.get('file_hash', ''),
+                    'identifier_info': metadata.get('identifier_info'),
+                    'metadata': metadata.get('metadata'),
+                    'references': metadata.get('references'),
+                    'equations': metadata.get('equations'),
+                    'citations': metadata.get('citations'),
+                    'errors': metadata.get('errors'),
+                }
+                for file_path, metadata in documents
+            ])
+        except Exception as e:
+            logger.error(f"Error adding document to store: {str(e)}")
+            return results
 
-            return store_success
+        consolidated = [(i, doc_metadata) for i, doc_metadata in enumerate(built) if doc_metadata is not None]
+        if not consolidated:
+            return results
 
+        try:
+            # Then add the same models to LightRAG, reusing the JSON dumps from the metadata save
+            store_results = await self.lightrag_store.add_documents_async(
+                [doc_metadata for _, doc_metadata in consolidated]
+            )
         except Exception as e:
             logger.error(f"Error adding document to store: {str(e)}")
-            return False
+            return results
+
+        for (i, _), store_success in zip(consolidated, store_results, strict=True):
+            results[i] = store_success
+        return results
 
     def add_document(self, file_path: Path, metadata: Dict[str, Any]) -> bool:
         """Synchronous wrapper for adding document."""
-        return asyncio.run(self.add_document_async(file_path, metadata))
+        return run_sync(self.add_document_async(file_path, metadata))
 
     async def remove_document_async(self, file_path: Path) -> bool:
         """Remove document from both stores asynchronously."""
         try:
+            # LightRAG keys documents by file hash, so look it up before the metadata row goes
+            metadata = await to_thread(self.metadata_consolidator.get_metadata, file_path)
+
             # Remove from metadata store
-            await asyncio.to_thread(
+            await to_thread(
                 self.metadata_consolidator.remove_metadata,
                 file_path
             )
 
             # Remove from LightRAG store
-            store_success = await asyncio.to_thread(
-                self.lightrag_store.remove_document,
-                str(file_path)
-            )
-
-            return store_success
+            if metadata is None:
+                return True
+            return await self.lightrag_store.remove_document_async(metadata.file_hash)
 
         except Exception as e:
             logger.error(f"Error removing document from store: {str(e)}")
@@ -86,7 +106,7 @@ class StoreManager:
 
     def remove_document(self, file_path: Path) -> bool:
         """Synchronous wrapper for removing document."""
-        return asyncio.run(self.remove_document_async(file_path))
+        return run_sync(self.remove_document_async(file_path))
 
     async def search_async(
         self,
@@ -96,8 +116,7 @@ class StoreManager:
         include_metadata: bool = True
     ) -> Dict[str, Any]:
         """Search documents using LightRAG asynchronously."""
-        return await asyncio.to_thread(
-            self.lightrag_store.search,
+        return await self.lightrag_store.search_async(
             query=query,
             mode=mode,
             max_results=max_results,
@@ -112,7 +131,7 @@ class StoreManager:
         include_metadata: bool = True
     ) -> Dict[str, Any]:
         """Synchronous wrapper for search."""
-        return asyncio.run(self.search_async(
+        return run_sync(self.search_async(
             query=query,
             mode=mode,
             max_results=max_results,
@@ -124,7 +143,7 @@ class StoreManager:
         file_path: Path
     ) -> Optional[DocumentMetadata]:
         """Get metadata for a specific document asynchronously."""
-        metadata = await asyncio.to_thread(
+        metadata = await to_thread(
             self.metadata_consolidator.get_metadata,
             file_path
         )
@@ -135,25 +154,24 @@ class StoreManager:
         file_path: Path
     ) -> Optional[DocumentMetadata]:
         """Synchronous wrapper for getting document metadata."""
-        return asyncio.run(self.get_document_metadata_async(file_path))
+        return run_sync(self.get_document_metadata_async(file_path))
 
     async def get_all_metadata_async(self) -> Dict[str, Any]:
         """Get metadata for all documents asynchronously."""
-        return await asyncio.to_thread(
+        return await to_thread(
             self.metadata_consolidator._load_metadata
         )
 
     def get_all_metadata(self) -> Dict[str, Any]:
         """Synchronous wrapper for getting all metadata."""
-        return asyncio.run(self.get_all_metadata_async())
+        return run_sync(self.get_all_metadata_async())
 
     async def get_store_stats_async(self) -> Dict[str, Any]:
         """Get statistics about the store asynchronously."""
-        lightrag_stats = await asyncio.to_thread(
-            self.lightrag_store.get_stats
+        lightrag_stats = await self.lightrag_store.get_stats_async()
+        metadata_count = await to_thread(
+            self.metadata_consolidator.count_metadata
         )
-        metadata = await self.get_all_metadata_async()
-        metadata_count = len(metadata.get("documents", {}))
 
         return {
             "document_count": metadata_count,
@@ -162,4 +180,4 @@ class StoreManager:
 
     def get_store_stats(self) -> Dict[str, Any]:
         """Synchronous wrapper for getting store stats."""
-        return asyncio.run(self.get_store_stats_async())
+        return run_sync(self.get_store_stats_async())
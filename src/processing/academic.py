@@ -0,0 +1,67 @@
+"""Equation and citation passes, run in worker processes to use every core.
+
+This module only imports the lightweight extractors, so spawned workers start
+quickly without loading marker, torch or the store.
+"""
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Tuple
+
+from ..core.extractors.citation_extractor import CitationExtractor
+from ..core.extractors.document_index import DocumentIndex
+from ..core.extractors.equation_extractor import EquationExtractor
+from ..core.metadata.models import Citation, Equation
+from ..utils.constants import CPU_POOL_WORKERS
+
+
+@lru_cache(maxsize=1)
+def get_equation_extractor() -> EquationExtractor:
+    """Return the process-wide equation extractor."""
+    return EquationExtractor()
+
+
+@lru_cache(maxsize=1)
+def get_citation_extractor() -> CitationExtractor:
+    """Return the process-wide citation extractor."""
+    return CitationExtractor()
+
+
+@lru_cache(maxsize=1)
+def get_cpu_pool() -> ProcessPoolExecutor:
+    """Return the pool for CPU-bound extraction passes, shut down when the interpreter exits."""
+    # Spawn rather than fork: the parent runs the background loop and I/O threads
+    pool = ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    atexit.register(pool.shutdown, cancel_futures=True)
+    return pool
+
+
+def blank_equations(text: str, equations: List[Equation]) -> str:
+    """Replace equation spans with spaces so citation offsets still match the original text."""
+    # Equation matches never overlap, so the clean text is assembled in one join
+    # instead of re-copying the whole document for every equation.
+    parts = []
+    pos = 0
+    for eq in sorted(equations, key=lambda x: x.location["start"]):
+        start = eq.location["start"]
+        end = eq.location["end"]
+        parts.append(text[pos:start])
+        parts.append(" " * (end - start))
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def extract_equations_and_citations(text: str) -> Tuple[List[Equation], List[Citation]]:
+    """Extract equations, then citations from the equation-free text."""
+    # Pre-parse once; blanking equations keeps offsets, so the index stays valid for clean text
+    index = DocumentIndex.build(text)
+
+    equations = get_equation_extractor().extract_equations(text)
+
+    # Numeric citations come back holding only 1-3 digit reference numbers, so years
+    # and page numbers are already filtered out by the extractor's single regex pass
+    citations = get_citation_extractor().extract_citations(blank_equations(text, equations), index)
+
+    return equations, citations
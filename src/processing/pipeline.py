@@ -3,28 +3,61 @@
 import asyncio
 import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-from ..core.extractors.citation_extractor import CitationExtractor
-from ..core.extractors.equation_extractor import EquationExtractor
 from ..core.extractors.identifier_extractor import IdentifierExtractor
-from ..core.extractors.pdf_extractor import PDFExtractor
+from ..core.extractors.pdf_extractor import ExtractionResult, PDFExtractor
 from ..core.extractors.reference_extractor import ReferenceExtractor
-from ..core.metadata.models import Author, Citation, DocumentMetadata, Equation, ProcessingMetadata, Reference
+from ..core.metadata.models import (
+    REFERENCE_LIST_ADAPTER,
+    Author,
+    DocumentMetadata,
+    ProcessingMetadata,
+    Reference,
+    validate_list,
+)
 from ..core.store.manager import StoreManager
-from ..utils.constants import ProcessingState
+from ..utils.constants import (
+    CPU_POOL_MIN_TEXT_CHARS,
+    CROSSREF_CACHE_PATH,
+    IDENTIFIER_CACHE_PATH,
+    PIPELINE_CONCURRENCY,
+    ProcessingState,
+)
+from ..utils.event_loop import run_sync, to_thread
 from ..utils.logger import logger
+from .academic import extract_equations_and_citations, get_citation_extractor, get_cpu_pool, get_equation_extractor
 
+# Separators between author names in a filename: ", " or " and "
+AUTHOR_SPLIT_PATTERN = re.compile(r",\s*|\s+and\s+")
 
-class ExtractionResult(NamedTuple):
-    """Result of content extraction step."""
 
-    text: str
-    markdown: str
-    file_hash: str
-    success: bool
-    error: Optional[str] = None
+@lru_cache(maxsize=1)
+def get_pdf_extractor() -> PDFExtractor:
+    """Return the process-wide PDF extractor."""
+    return PDFExtractor()
+
+
+@lru_cache(maxsize=1)
+def get_identifier_extractor() -> IdentifierExtractor:
+    """Return the process-wide identifier extractor."""
+    # Cache paths are read at first call, so tests can point them at a temporary directory
+    return IdentifierExtractor(cache_path=IDENTIFIER_CACHE_PATH)
+
+
+@lru_cache(maxsize=1)
+def get_reference_extractor() -> ReferenceExtractor:
+    """Return the process-wide reference extractor, whose HTTP session and Anystyle worker are reused."""
+    return ReferenceExtractor(cache_path=CROSSREF_CACHE_PATH)
+
+
+@lru_cache(maxsize=1)
+def get_store_manager() -> StoreManager:
+    """Return the store manager used when a pipeline is not given one, so the embedding model loads once."""
+    return StoreManager()
+
 
 class MetadataResult(NamedTuple):
     """Result of metadata extraction and processing."""
@@ -43,12 +76,13 @@ class ProcessingPipeline:
 
     def __init__(self, store_manager: Optional[StoreManager] = None):
         """Initialize pipeline with extractors."""
-        self.pdf_extractor = PDFExtractor()
-        self.identifier_extractor = IdentifierExtractor()
-        self.reference_extractor = ReferenceExtractor()
-        self.equation_extractor = EquationExtractor()
-        self.citation_extractor = CitationExtractor()
-        self.store_manager = store_manager or StoreManager()
+        # Extractors and the default store are shared by every pipeline in the process
+        self.pdf_extractor = get_pdf_extractor()
+        self.identifier_extractor = get_identifier_extractor()
+        self.reference_extractor = get_reference_extractor()
+        self.equation_extractor = get_equation_extractor()
+        self.citation_extractor = get_citation_extractor()
+        self.store_manager = store_manager or get_store_manager()
 
     def _extract_metadata_from_filename(self, file_path: Path) -> Dict[str, Any]:
         """Extract metadata from filename.
@@ -56,7 +90,7 @@ class ProcessingPipeline:
         """
         filename = file_path.stem
         # Remove -annotated suffix if present
-        filename = re.sub(r"-annotated$", "", filename)
+        filename = filename.removesuffix("-annotated")
 
         # Split on ' - ' but keep the delimiters
         parts = [p.strip() for p in filename.split(" - ")]
@@ -66,13 +100,13 @@ class ProcessingPipeline:
 
             # Parse authors
             authors = []
-            if " et al." in authors_str:
-                # Single author with et al.
-                author = authors_str.replace(" et al.", "")
+            # Most filenames name a single author with et al.; one partition both tests and splits
+            author, et_al, _ = authors_str.partition(" et al.")
+            if et_al:
                 authors.append(Author(full_name=author))
             else:
                 # Multiple authors separated by ' and ' or ', '
-                author_list = re.split(r",\s*|\s+and\s+", authors_str)
+                author_list = AUTHOR_SPLIT_PATTERN.split(authors_str)
                 authors.extend(Author(full_name=a.strip()) for a in author_list if a.strip())
 
             # Parse year
@@ -95,6 +129,76 @@ class ProcessingPipeline:
 
     async def process_document(self, file_path: Path) -> Dict[str, Any]:
         """Process document through extraction pipeline."""
+        doc_metadata, result = await self._analyze_document(file_path)
+        if doc_metadata is None:
+            return result
+
+        # Step 5: Store
+        store_success = await self.store_manager.add_document_async(
+            file_path=file_path, metadata=self._store_payload(doc_metadata)
+        )
+        return result if store_success else self._create_result(ProcessingState.FAILED, ["Store update failed"])
+
+    async def process_documents(
+        self, file_paths: List[Path], concurrency: int = PIPELINE_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """Process documents concurrently, then store them all in one batch."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def analyze(file_path: Path) -> Tuple[Optional[DocumentMetadata], Dict[str, Any]]:
+            async with semaphore:
+                return await self._analyze_document(file_path)
+
+        # Overlap PDF reads and identifier lookups across documents, at most `concurrency` at a time
+        analyzed = await asyncio.gather(*(analyze(file_path) for file_path in file_paths))
+        results = [result for _, result in analyzed]
+
+        # Flush every analyzed document to the store at once, so embeddings are computed in one batch
+        pending = [i for i, (doc_metadata, _) in enumerate(analyzed) if doc_metadata is not None]
+        if pending:
+            store_results = await self.store_manager.add_documents_async(
+                [(file_paths[i], self._store_payload(analyzed[i][0])) for i in pending]
+            )
+            for i, store_success in zip(pending, store_results, strict=True):
+                if not store_success:
+                    results[i] = self._create_result(ProcessingState.FAILED, ["Store update failed"])
+
+        return results
+
+    async def _cached_result(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Return a result for a file already stored unchanged and complete, or None if it must be processed."""
+        try:
+            stored = await self.store_manager.get_document_metadata_async(file_path)
+            if (
+                stored is None
+                or stored.processing_status != ProcessingState.COMPLETED.label
+                or stored.schema_version != self.store_manager.metadata_consolidator.schema_version
+            ):
+                return None
+            # The metadata row is saved before the LightRAG write, so a failed LightRAG write
+            # still leaves a "completed" row behind; only skip documents LightRAG holds as well
+            if not await to_thread(self.store_manager.lightrag_store.has_document, stored.file_hash):
+                return None
+            # Only hash files that have a stored record, so new documents skip the extra read
+            file_hash = await to_thread(self.pdf_extractor.get_file_hash, file_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not check stored document: {str(e)}")
+            return None
+
+        if not file_hash or file_hash != stored.file_hash:
+            return None
+
+        logger.info(f"✓ Already processed, skipping: {file_path}")
+        result = self._create_result(ProcessingState.COMPLETED, [])
+        result["cached"] = True
+        return result
+
+    async def _analyze_document(self, file_path: Path) -> Tuple[Optional[DocumentMetadata], Dict[str, Any]]:
+        """Run the extraction steps, returning the document metadata (None if failed or unchanged) and its result."""
+        cached = await self._cached_result(file_path)
+        if cached is not None:
+            return None, cached
+
         try:
             logger.info(f"Processing document: {file_path}")
             processing = self._initialize_processing()
@@ -106,12 +210,12 @@ class ProcessingPipeline:
             content = await self._extract_content(file_path)
             if not content.success:
                 errors.append(content.error or "Text extraction failed")
-                return self._create_result(state, errors)
+                return None, self._create_result(state, errors)
             processing.steps_completed.append("text_extraction")
 
             # Step 2: Process metadata
             state = ProcessingState.EXTRACTING_IDENTIFIER
-            metadata = await self._process_metadata(file_path, content.text)
+            metadata = await self._process_metadata(file_path, content.file_hash)
             processing.steps_completed.append("identifier_extraction")
             processing.extraction_methods["identifier"] = metadata.extraction_method
 
@@ -122,9 +226,9 @@ class ProcessingPipeline:
             )
             processing.steps_completed.extend(["reference_extraction", "equation_extraction", "citation_extraction"])
 
-            # Step 4: Validate and store
+            # Step 4: Validate
             state = ProcessingState.VALIDATING
-            result = await self._validate_and_store(
+            doc_metadata = self._build_document_metadata(
                 file_path=file_path,
                 content=content,
                 metadata=metadata,
@@ -132,11 +236,11 @@ class ProcessingPipeline:
                 processing=processing,
             )
 
-            return result
+            return doc_metadata, self._create_result(ProcessingState.from_label(doc_metadata.processing_status), [])
 
         except Exception as e:
             logger.error(f"Pipeline error: {str(e)}")
-            return self._create_result(ProcessingState.FAILED, [str(e)])
+            return None, self._create_result(ProcessingState.FAILED, [str(e)])
 
     def _initialize_processing(self) -> ProcessingMetadata:
         """Initialize processing metadata."""
@@ -149,29 +253,19 @@ class ProcessingPipeline:
     async def _extract_content(self, file_path: Path) -> ExtractionResult:
         """Extract text content from document."""
         try:
-            extraction_results = await asyncio.to_thread(self.pdf_extractor.extract_all, file_path)
-
-            text = extraction_results.get("text")
-            markdown = extraction_results.get("markdown")
-
-            if not text or not markdown:
-                return ExtractionResult("", "", "", False, "Failed to extract text content")
-
-            return ExtractionResult(
-                text=text, markdown=markdown, file_hash=extraction_results["file_hash"], success=True
-            )
+            return await to_thread(self.pdf_extractor.extract_all, file_path)
 
         except Exception as e:
             logger.error(f"Content extraction error: {e}")
             return ExtractionResult("", "", "", False, str(e))
 
-    async def _process_metadata(self, file_path: Path, text: str) -> MetadataResult:
+    async def _process_metadata(self, file_path: Path, file_hash: str) -> MetadataResult:
         """Process and merge metadata from filename and identifiers."""
         # Get metadata from filename
         filename_meta = self._extract_metadata_from_filename(file_path)
 
-        # Try to get metadata from identifiers
-        identifier_info = await asyncio.to_thread(self.identifier_extractor.extract_identifier, file_path) or {}
+        # Try to get metadata from identifiers; re-ingested files hit the cache by content hash
+        identifier_info = await to_thread(self.identifier_extractor.extract_identifier, file_path, file_hash) or {}
 
         # Merge metadata, preferring identifier info
         return MetadataResult(
@@ -188,14 +282,16 @@ class ProcessingPipeline:
         self, text: str, identifier: Optional[str], identifier_type: Optional[str]
     ) -> Dict[str, Any]:
         """Process academic content (references, equations, citations)."""
-        # Extract and process references
-        references = await self._process_references(text, identifier, identifier_type)
-
-        # Extract equations and get clean text
-        equations, clean_text = await self._process_equations(text)
-
-        # Extract citations from clean text
-        citations = await self._process_citations(clean_text)
+        # Extract references on a worker thread and the CPU-bound equation/citation passes alongside,
+        # so the Crossref round trip overlaps them; long texts go to a worker process to run outside
+        # the GIL, short ones stay on a thread where pickling the text would cost more than it saves
+        if len(text) >= CPU_POOL_MIN_TEXT_CHARS:
+            academic = asyncio.get_running_loop().run_in_executor(get_cpu_pool(), extract_equations_and_citations, text)
+        else:
+            academic = to_thread(extract_equations_and_citations, text)
+        references, (equations, citations) = await asyncio.gather(
+            self._process_references(text, identifier, identifier_type), academic
+        )
 
         return {"references": references, "equations": equations, "citations": citations}
 
@@ -203,8 +299,7 @@ class ProcessingPipeline:
         self, text: str, identifier: Optional[str], identifier_type: Optional[str]
     ) -> List[Reference]:
         """Process references with proper ID assignment."""
-        raw_references = await asyncio.to_thread(
-            self.reference_extractor.extract_references,
+        raw_references = await self.reference_extractor.extract_references_async(
             identifier=identifier,
             identifier_type=identifier_type,
             text=text,
@@ -217,30 +312,35 @@ class ProcessingPipeline:
                 ref["reference_id"] = ref_id
                 if not ref.get("title"):
                     ref["raw_text"] = ref.get("raw_text", f"Reference {i}")
-                references.append(Reference.model_validate(ref))
+                references.append(ref)
             elif hasattr(ref, "model_dump"):
                 ref.reference_id = ref_id
                 if not ref.title:
                     ref.raw_text = ref.raw_text or f"Reference {i}"
                 references.append(ref)
 
-        return references
+        # Validate dict references in one adapter call; extractor models are kept as-is
+        return validate_list(REFERENCE_LIST_ADAPTER, references)
 
-    async def _validate_and_store(
+    def _build_document_metadata(
         self,
         file_path: Path,
         content: ExtractionResult,
         metadata: MetadataResult,
         academic_content: Dict[str, Any],
         processing: ProcessingMetadata,
-    ) -> Dict[str, Any]:
-        """Validate and store processed document."""
+    ) -> DocumentMetadata:
+        """Validate processed document and build its final metadata."""
         # Validate basic metadata
         has_basic_metadata = bool(metadata.title and metadata.authors)
         processing.validation_results["basic_metadata"] = has_basic_metadata
 
-        # Create document metadata
-        doc_metadata = DocumentMetadata(
+        # Final state is known before storing, so the document is written once
+        state = ProcessingState.COMPLETED if has_basic_metadata else ProcessingState.VALIDATION_FAILED
+        processing.completed_at = datetime.now()
+        processing.duration = (processing.completed_at - processing.started_at).total_seconds()
+
+        return DocumentMetadata(
             file_path=str(file_path),
             file_hash=content.file_hash,
             identifier=metadata.identifier,
@@ -253,75 +353,43 @@ class ProcessingPipeline:
             equations=academic_content["equations"],
             citations=academic_content["citations"],
             processing=processing,
-            processing_status=ProcessingState.VALIDATING.value,
+            processing_status=state.label,
             validated=has_basic_metadata,
             validation_errors=[] if has_basic_metadata else ["basic_metadata validation failed"],
         )
 
-        # Store metadata
-        store_success = await self.store_manager.add_document_async(
-            file_path=file_path, metadata=doc_metadata.model_dump()
-        )
-
-        # Update final state
-        if store_success:
-            state = ProcessingState.COMPLETED if has_basic_metadata else ProcessingState.VALIDATION_FAILED
-
-            # Update metadata with final state
-            doc_metadata.processing_status = state.value
-            doc_metadata.processing.completed_at = datetime.now()
-            doc_metadata.processing.duration = (
-                doc_metadata.processing.completed_at - doc_metadata.processing.started_at
-            ).total_seconds()
-
-            # Store updated metadata
-            await self.store_manager.add_document_async(file_path=file_path, metadata=doc_metadata.model_dump())
-
-            return self._create_result(state, [])
-
-        return self._create_result(ProcessingState.FAILED, ["Store update failed"])
+    @staticmethod
+    def _store_payload(doc_metadata: DocumentMetadata) -> Dict[str, Any]:
+        """Shape document metadata for the store, handing over its models instead of a full model_dump."""
+        # The consolidator passes model instances through without re-validating them
+        return {
+            "file_hash": doc_metadata.file_hash,
+            "identifier_info": {
+                "identifier": doc_metadata.identifier,
+                "identifier_type": doc_metadata.identifier_type,
+                "method": doc_metadata.processing.extraction_methods.get("identifier", "unknown"),
+            },
+            "metadata": {
+                "title": doc_metadata.title,
+                "authors": doc_metadata.authors,
+                "abstract": doc_metadata.abstract,
+                "year": doc_metadata.year,
+            },
+            "references": doc_metadata.references,
+            "equations": doc_metadata.equations,
+            "citations": doc_metadata.citations,
+        }
 
     def process_document_sync(self, file_path: Path) -> Dict[str, Any]:
         """Synchronous wrapper for document processing."""
-        return asyncio.run(self.process_document(file_path))
+        return run_sync(self.process_document(file_path))
+
+    def process_documents_sync(
+        self, file_paths: List[Path], concurrency: int = PIPELINE_CONCURRENCY
+    ) -> List[Dict[str, Any]]:
+        """Synchronous wrapper for batch document processing."""
+        return run_sync(self.process_documents(file_paths, concurrency))
 
     def _create_result(self, state: ProcessingState, errors: list) -> Dict[str, Any]:
         """Create standardized result dictionary."""
-        return {"state": state.value, "success": state == ProcessingState.COMPLETED, "errors": errors}
-
-    async def _process_equations(self, text: str) -> Tuple[List[Equation], str]:
-        """Extract equations and return clean text."""
-        # Extract equations
-        equations = self.equation_extractor.extract_equations(text)
-
-        # Remove equation content from text to avoid interference with citations
-        clean_text = text
-        for eq in sorted(equations, key=lambda x: x.location["start"], reverse=True):
-            start = eq.location["start"]
-            end = eq.location["end"]
-            # Replace equation with placeholder to maintain text positions
-            clean_text = clean_text[:start] + " " * (end - start) + clean_text[end:]
-
-        return equations, clean_text
-
-    async def _process_citations(self, text: str) -> List[Citation]:
-        """Extract and filter citations from clean text."""
-        citations = self.citation_extractor.extract_citations(text)
-
-        # Filter out potential years
-        filtered_citations = []
-        for citation in citations:
-            if citation.citation_type == "numeric":
-                # Check if citation numbers are valid (not years)
-                numbers = [
-                    num.strip()
-                    for num in citation.normalized_text.split(",")
-                    if len(num.strip()) <= 3  # Exclude 4-digit numbers (years)
-                ]
-                if numbers:
-                    citation.normalized_text = ",".join(numbers)
-                    filtered_citations.append(citation)
-            else:
-                filtered_citations.append(citation)
-
-        return filtered_citations
+        return {"state": state.label, "success": state == ProcessingState.COMPLETED, "errors": errors}
@@ -1,180 +1,201 @@
 """Individual processing steps for the pipeline."""
+import asyncio
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Set, Tuple
 
 from ..utils.constants import ProcessingState
+from ..utils.event_loop import to_thread
 from ..utils.logger import logger
 
 
 class ProcessingStep(ABC):
-    """Base class for processing steps."""
+    """Base class for processing steps.
 
-    def __init__(self, next_step: Optional['ProcessingStep'] = None):
-        """Initialize step with optional next step."""
-        self.next_step = next_step
+    A step names the steps whose outputs it reads in `requires`; PipelineRunner
+    starts it as soon as all of them have finished.
+    """
+
+    name: str
+    label: str
+    state: ProcessingState
+    requires: Tuple[str, ...] = ()
 
     @abstractmethod
-    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Process the step and update context."""
+    async def run(self, context: Mapping[str, Any]) -> Dict[str, Any]:
+        """Run the step against a read-only context and return the keys it adds."""
         pass
 
-    def _continue(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Continue to next step if available."""
-        if self.next_step:
-            return self.next_step.process(context)
+
+class PipelineRunner:
+    """Run processing steps as a dependency graph, overlapping independent steps."""
+
+    def __init__(self, steps: List[ProcessingStep]):
+        """Initialize runner with the steps to schedule."""
+        self.steps = steps
+
+    async def run(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run every step once its requirements are met, stopping at the first failure."""
+        view = MappingProxyType(context)
+        pending = list(self.steps)
+        running: Dict[asyncio.Task, ProcessingStep] = {}
+        done: Set[str] = set()
+
+        while pending or running:
+            # Launch every step whose inputs are all available
+            for step in [step for step in pending if done.issuperset(step.requires)]:
+                pending.remove(step)
+                running[asyncio.create_task(step.run(view))] = step
+            if not running:
+                raise ValueError(f"Unsatisfiable step requirements: {[step.name for step in pending]}")
+
+            finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                step = running.pop(task)
+                try:
+                    outputs = task.result()
+                except Exception as e:
+                    logger.error(f"{step.label} failed: {str(e)}")
+                    for other in running:
+                        other.cancel()
+                    # Wait for the cancelled steps to unwind before reporting the failure
+                    await asyncio.gather(*running, return_exceptions=True)
+                    context['state'] = ProcessingState.FAILED
+                    context['errors'] = [str(e)]
+                    return context
+
+                context.update(outputs)
+                context['state'] = step.state
+                done.add(step.name)
+
         return context
 
+
 class ValidationStep(ProcessingStep):
     """Validate input file."""
 
-    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    name = 'validation'
+    label = 'Validation'
+    state = ProcessingState.INITIALIZED
+
+    async def run(self, context: Mapping[str, Any]) -> Dict[str, Any]:
         """Validate file exists and is PDF."""
-        try:
-            file_path = Path(context['file_path'])
-            if not file_path.exists():
-                raise ValueError(f"File not found: {file_path}")
-            if file_path.suffix.lower() != '.pdf':
-                raise ValueError(f"Not a PDF file: {file_path}")
-
-            context['state'] = ProcessingState.INITIALIZED
-            return self._continue(context)
-
-        except Exception as e:
-            logger.error(f"Validation failed: {str(e)}")
-            context['state'] = ProcessingState.FAILED
-            context['errors'] = [str(e)]
-            return context
+        file_path = Path(context['file_path'])
+        if not file_path.exists():
+            raise ValueError(f"File not found: {file_path}")
+        if file_path.suffix.lower() != '.pdf':
+            raise ValueError(f"Not a PDF file: {file_path}")
+        return {}
+
 
 class TextExtractionStep(ProcessingStep):
     """Extract text and markdown from PDF."""
 
-    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract text content."""
-        try:
-            file_path = Path(context['file_path'])
-            extractor = context['extractors']['pdf']
+    name = 'text'
+    label = 'Text extraction'
+    state = ProcessingState.EXTRACTING_TEXT
+    requires = ('validation',)
 
-            results = extractor.extract_all(file_path)
-            if not results.get('text') or not results.get('markdown'):
-                raise ValueError("Text extraction failed")
+    async def run(self, context: Mapping[str, Any]) -> Dict[str, Any]:
+        """Extract text content."""
+        extractor = context['extractors']['pdf']
 
-            context.update({
-                'text': results['text'],
-                'markdown': results['markdown'],
-                'file_hash': results['file_hash'],
-                'state': ProcessingState.EXTRACTING_TEXT
-            })
+        results = await to_thread(extractor.extract_all, Path(context['file_path']))
+        if not results.success:
+            raise ValueError(results.error or "Text extraction failed")
 
-            return self._continue(context)
+        return {
+            'text': results.text,
+            'markdown': results.markdown,
+            'file_hash': results.file_hash,
+        }
 
-        except Exception as e:
-            logger.error(f"Text extraction failed: {str(e)}")
-            context['state'] = ProcessingState.FAILED
-            context['errors'] = [str(e)]
-            return context
 
 class IdentifierExtractionStep(ProcessingStep):
     """Extract DOI/arXiv identifier."""
 
-    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract identifier."""
-        try:
-            file_path = Path(context['file_path'])
-            extractor = context['extractors']['identifier']
+    name = 'identifier'
+    label = 'Identifier extraction'
+    state = ProcessingState.EXTRACTING_IDENTIFIER
+    requires = ('validation',)
 
-            identifier_info = extractor.extract_identifier(file_path)
-            if not identifier_info:
-                raise ValueError("No identifier found")
+    async def run(self, context: Mapping[str, Any]) -> Dict[str, Any]:
+        """Extract identifier."""
+        extractor = context['extractors']['identifier']
 
-            context['identifier_info'] = identifier_info
-            context['state'] = ProcessingState.EXTRACTING_IDENTIFIER
+        identifier_info = await to_thread(extractor.extract_identifier, Path(context['file_path']))
+        if not identifier_info:
+            raise ValueError("No identifier found")
 
-            return self._continue(context)
+        return {'identifier_info': identifier_info}
 
-        except Exception as e:
-            logger.error(f"Identifier extraction failed: {str(e)}")
-            context['state'] = ProcessingState.FAILED
-            context['errors'] = [str(e)]
-            return context
 
 class ReferenceExtractionStep(ProcessingStep):
     """Extract references."""
 
-    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract references."""
-        try:
-            extractor = context['extractors']['reference']
-            identifier_info = context['identifier_info']
+    name = 'references'
+    label = 'Reference extraction'
+    state = ProcessingState.EXTRACTING_REFERENCES
+    requires = ('text', 'identifier')
 
-            references = extractor.extract_references(
-                identifier=identifier_info['identifier'],
-                identifier_type=identifier_info['identifier_type'],
-                text=context.get('text')
-            )
+    async def run(self, context: Mapping[str, Any]) -> Dict[str, Any]:
+        """Extract references."""
+        extractor = context['extractors']['reference']
+        identifier_info = context['identifier_info']
 
-            context['references'] = references
-            context['state'] = ProcessingState.EXTRACTING_REFERENCES
+        references = await extractor.extract_references_async(
+            identifier=identifier_info['identifier'],
+            identifier_type=identifier_info['identifier_type'],
+            text=context.get('text')
+        )
 
-            return self._continue(context)
+        return {'references': references}
 
-        except Exception as e:
-            logger.error(f"Reference extraction failed: {str(e)}")
-            context['state'] = ProcessingState.FAILED
-            context['errors'] = [str(e)]
-            return context
 
 class EquationExtractionStep(ProcessingStep):
     """Extract equations."""
 
-    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract equations."""
-        try:
-            extractor = context['extractors']['equation']
+    name = 'equations'
+    label = 'Equation extraction'
+    state = ProcessingState.EXTRACTING_EQUATIONS
+    requires = ('text',)
 
-            equations = extractor.extract_equations(context['markdown'])
+    async def run(self, context: Mapping[str, Any]) -> Dict[str, Any]:
+        """Extract equations."""
+        extractor = context['extractors']['equation']
 
-            context['equations'] = equations
-            context['state'] = ProcessingState.EXTRACTING_EQUATIONS
+        equations = await to_thread(extractor.extract_equations, context['markdown'])
 
-            return self._continue(context)
+        return {'equations': equations}
 
-        except Exception as e:
-            logger.error(f"Equation extraction failed: {str(e)}")
-            context['state'] = ProcessingState.FAILED
-            context['errors'] = [str(e)]
-            return context
 
 class StorageStep(ProcessingStep):
     """Store extracted information."""
 
-    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    name = 'storage'
+    label = 'Storage'
+    state = ProcessingState.COMPLETED
+    requires = ('references', 'equations')
+
+    async def run(self, context: Mapping[str, Any]) -> Dict[str, Any]:
         """Store metadata."""
-        try:
-            store_manager = context['store_manager']
-            file_path = Path(context['file_path'])
-
-            metadata = {
-                'file_hash': context['file_hash'],
-                'identifier_info': context['identifier_info'],
-                'references': context['references'],
-                'equations': context['equations'],
-                'errors': context.get('errors', [])
-            }
-
-            success = store_manager.add_document(
-                file_path=file_path,
-                metadata=metadata
-            )
-
-            if not success:
-                raise ValueError("Store update failed")
-
-            context['state'] = ProcessingState.COMPLETED
-            return self._continue(context)
-
-        except Exception as e:
-            logger.error(f"Storage failed: {str(e)}")
-            context['state'] = ProcessingState.FAILED
-            context['errors'] = [str(e)]
-            return context
+        store_manager = context['store_manager']
+
+        metadata = {
+            'file_hash': context['file_hash'],
+            'identifier_info': context['identifier_info'],
+            'references': context['references'],
+            'equations': context['equations'],
+            'errors': context.get('errors', [])
+        }
+
+        success = await store_manager.add_document_async(
+            file_path=Path(context['file_path']),
+            metadata=metadata
+        )
+
+        if not success:
+            raise ValueError("Store update failed")
+
+        return {}
@@ -1,14 +1,37 @@
 """Application constants and configuration."""
 
-from enum import Enum
+import os
+from enum import IntEnum
 from pathlib import Path
 
 
 # Processing states
-class ProcessingState(str, Enum):
-    PROCESSING = "processing"
-    COMPLETED = "completed"
-    FAILED = "failed"
+class ProcessingState(IntEnum):
+    INITIALIZED = 0
+    PROCESSING = 1
+    EXTRACTING_TEXT = 2
+    EXTRACTING_IDENTIFIER = 3
+    EXTRACTING_REFERENCES = 4
+    EXTRACTING_EQUATIONS = 5
+    PROCESSING_CONTENT = 6
+    VALIDATING = 7
+    VALIDATION_FAILED = 8
+    COMPLETED = 9
+    FAILED = 10
+
+    @property
+    def label(self) -> str:
+        """Name used in results and stored metadata, e.g. "completed"."""
+        return _STATE_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "ProcessingState":
+        """Look up a state by its label."""
+        return _STATES_BY_LABEL[label]
+
+
+_STATE_LABELS = {state: state.name.lower() for state in ProcessingState}
+_STATES_BY_LABEL = {label: state for state, label in _STATE_LABELS.items()}
 
 
 # Storage paths
@@ -19,21 +42,44 @@ DEFAULT_STORE_PATH = PROCESSED_OUTPUT_PATH / "lightrag_store"
 # API configurations
 CROSSREF_API_URL = "https://api.crossref.org/works/"
 ARXIV_API_URL = "http://export.arxiv.org/api/query?"
+ARXIV_DOI_PREFIX = "10.48550/arXiv."  # arXiv registers a DOI for every paper: 10.48550/arXiv.<id>
 API_TIMEOUT = 10
-CROSSREF_HEADERS = {"User-Agent": "LightWriter/1.0 (mailto:your@email.com)"}
+CROSSREF_TIMEOUT = (3.05, API_TIMEOUT)  # (connect, read) seconds
+CROSSREF_CACHE_PATH = DEFAULT_STORE_PATH / "crossref_cache.sqlite"
+CROSSREF_CACHE_TTL = 30 * 24 * 3600  # Seconds a resolved DOI stays cached
+CROSSREF_NEGATIVE_TTL = 24 * 3600  # Seconds a DOI without references stays cached
+CROSSREF_MEMORY_CACHE_SIZE = 4096  # DOIs also kept in memory in front of the SQLite cache
+IDENTIFIER_CACHE_PATH = DEFAULT_STORE_PATH / "identifier_cache.sqlite"
+IDENTIFIER_CACHE_TTL = 180 * 24 * 3600  # Seconds an identifier stays cached; keyed by content, so it rarely changes
+IDENTIFIER_NEGATIVE_TTL = 24 * 3600  # Seconds a PDF without an identifier stays cached
+CROSSREF_BATCH_SIZE = 40  # DOIs per filter query, keeps the URL around 2KB
+CROSSREF_MAX_CONCURRENT = 8  # Filter queries in flight at once; below the session's 16 pooled connections
+CROSSREF_SELECT_FIELDS = "DOI,reference"  # Fields returned by filter queries; the rest of each work is dropped
+# Crossref etiquette: identifying the client with a mailto routes requests to the polite pool
+CROSSREF_CONTACT_EMAIL = os.getenv("LIGHTWRITER_CONTACT_EMAIL", "your@email.com")
+CROSSREF_HEADERS = {
+    "User-Agent": f"LightWriter/0.1.0 (https://github.com/flight505/LightWriter; mailto:{CROSSREF_CONTACT_EMAIL})"
+}
 
 # Processing parameters
 CONTEXT_WINDOW = 3  # Sentences around citations for context
 MAX_FILE_SIZE_MB = 50
+ALLOWED_MIME_TYPES = ["application/pdf"]
+PIPELINE_CONCURRENCY = 8  # Documents analyzed at once by ProcessingPipeline.process_documents
+IO_THREADS = int(os.getenv("LIGHTWRITER_IO_THREADS", "64"))  # Worker threads for blocking store and extractor calls
+# Worker processes for equation/citation passes; more than the documents in flight would sit idle
+CPU_POOL_WORKERS = max(1, min(PIPELINE_CONCURRENCY, os.cpu_count() or 1))
+CPU_POOL_MIN_TEXT_CHARS = 100_000  # Shorter texts run on a worker thread; pickling them to a process costs more
 
 # Vector storage
 DEFAULT_EMBEDDING_DIM = 384  # Dimension for vector embeddings
 VECTOR_STORE_PATH = PROCESSED_OUTPUT_PATH / "vector_store"
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
-
-# Vector storage
-DEFAULT_EMBEDDING_DIM = 384  # Dimension for vector embeddings
-ALLOWED_MIME_TYPES = ["application/pdf"]
+EMBEDDING_BATCH_SIZE = 32  # Texts per encoder forward pass
+EMBEDDING_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"  # int8-quantized export shipped with the model
+# "torch" (fp32) or "onnx" (the int8 export above, CPU); recorded per store so its vectors never mix backends
+EMBEDDING_BACKEND = os.getenv("LIGHTWRITER_EMBEDDING_BACKEND", "torch")
+EMBEDDING_BACKENDS = ("torch", "onnx")
 
 # Application messages
 ERROR_MESSAGES = {
@@ -41,12 +87,17 @@ ERROR_MESSAGES = {
     "validation_failed": "Validation failed for {field}: {reason}",
     "api_connection": "API connection failed: {error}",
     "xml_parse": "XML parsing failed: {error}",
+    "api_error": "{service} API error: {error}",
+    "store_error": "Store operation failed: {error}",
 }
 
 SUCCESS_MESSAGES = {
     "text_extraction": "Text extraction successful",
     "markdown_conversion": "Markdown conversion successful",
     "reference_lookup": "Reference lookup successful",
+    "identifier_found": "✓ Found {identifier_type}: {identifier}",
+    "references_found": "✓ Found {count} references",
+    "store_update": "✓ Store updated",
 }
 
 # PDF processing configuration
@@ -0,0 +1,54 @@
+"""Shared background event loop and thread pool behind the synchronous API wrappers."""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Optional
+
+from .constants import IO_THREADS
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Return the shared pool for blocking calls, sized by IO_THREADS rather than the CPU count."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="lightwriter-io")
+    return _executor
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine on the persistent background loop and wait for its result.
+
+    The loop is started on first use and reused afterwards, so sync callers avoid
+    asyncio.run creating and tearing down a loop per call. Must not be called from
+    a coroutine running on that loop.
+    """
+    global _loop
+    executor = get_io_executor()
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop.set_default_executor(executor)
+            threading.Thread(target=_loop.run_forever, name="lightwriter-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def to_thread(func: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call on the shared I/O pool, like asyncio.to_thread.
+
+    The contextvars context is only copied into the worker when a variable is set,
+    which this codebase never does, so the usual call skips the ctx.run wrapper.
+    """
+    loop = asyncio.get_running_loop()
+    if kwargs:
+        func = functools.partial(func, **kwargs)
+    ctx = contextvars.copy_context()
+    if ctx:
+        return await loop.run_in_executor(get_io_executor(), ctx.run, func, *args)
+    return await loop.run_in_executor(get_io_executor(), func, *args)
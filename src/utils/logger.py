@@ -1,39 +1,64 @@
-"""Logging configuration for Lightwriter_CLI."""
+"""Logging configuration for Lightwriter_CLI.
+
+Records below the logger level are dropped before formatting, but f-string
+arguments are built regardless; for expensive debug output prefer
+``logger.debug("x=%s", value)`` or guard with ``logger.isEnabledFor(logging.DEBUG)``.
+"""
+import copy
 import logging
+import os
 import sys
-
-from termcolor import colored
+from typing import Any
 
 from .constants import DEFAULT_STORE_PATH
 
-# Create logs directory
+# Logs directory, created when the file handler is set up
 LOGS_DIR = DEFAULT_STORE_PATH / "logs"
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
+
+# LIGHTWRITER_LOG_FILE values that turn the log file off; anything else keeps it on
+LOG_FILE_DISABLED_VALUES = frozenset({"0", "false", "no", "off"})
+
+# ANSI escapes, precomputed so formatting a record is a dict lookup
+ANSI_RESET = "\x1b[0m"
+
 
 class ColoredFormatter(logging.Formatter):
     """Custom formatter for colored console output."""
 
     COLORS = {
-        'DEBUG': 'grey',
-        'INFO': 'white',
-        'WARNING': 'yellow',
-        'ERROR': 'red',
-        'CRITICAL': 'red'
+        'DEBUG': "\x1b[30m",  # grey
+        'INFO': "\x1b[97m",  # white
+        'WARNING': "\x1b[33m",  # yellow
+        'ERROR': "\x1b[31m",  # red
+        'CRITICAL': "\x1b[31m",  # red
     }
 
+    # Success/warning/error indicators lead their messages
+    MARKER_COLORS = {
+        '✓': "\x1b[32m",  # green
+        '⚠': "\x1b[33m",  # yellow
+        '❌': "\x1b[31m",  # red
+    }
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Initialize formatter, coloring only when stdout is a terminal."""
+        super().__init__(*args, **kwargs)
+        self._enabled = sys.stdout.isatty()
+
     def format(self, record):
         """Format log record with colors."""
-        # Color the level name
-        if record.levelname in self.COLORS:
-            record.levelname = colored(record.levelname, self.COLORS[record.levelname])
-
-        # Color success/error indicators in messages
-        if '✓' in record.msg:
-            record.msg = colored(record.msg, 'green')
-        elif '⚠️' in record.msg:
-            record.msg = colored(record.msg, 'yellow')
-        elif '❌' in record.msg:
-            record.msg = colored(record.msg, 'red')
+        if not self._enabled:
+            return super().format(record)
+
+        # Color a copy so other handlers (the log file) never see ANSI codes
+        record = copy.copy(record)
+        level_color = self.COLORS.get(record.levelname)
+        if level_color:
+            record.levelname = f"{level_color}{record.levelname}{ANSI_RESET}"
+        if isinstance(record.msg, str):
+            marker_color = self.MARKER_COLORS.get(record.msg[:1])
+            if marker_color:
+                record.msg = f"{marker_color}{record.msg}{ANSI_RESET}"
 
         return super().format(record)
 
@@ -50,13 +75,16 @@ def setup_logging(name: str = "lightwriter") -> logging.Logger:
     console_handler.setFormatter(ColoredFormatter('%(levelname)s: %(message)s'))
     logger.addHandler(console_handler)
 
-    # File handler for debug logging
-    file_handler = logging.FileHandler(LOGS_DIR / "lightwriter.log", encoding='utf-8')
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    ))
-    file_handler.setLevel(logging.DEBUG)
-    logger.addHandler(file_handler)
+    # File handler for debug logging; set LIGHTWRITER_LOG_FILE to 0/false/no/off
+    # to disable, and the file itself is only opened by the first record
+    if os.environ.get("LIGHTWRITER_LOG_FILE", "1").strip().lower() not in LOG_FILE_DISABLED_VALUES:
+        LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(LOGS_DIR / "lightwriter.log", encoding='utf-8', delay=True)
+        file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        ))
+        file_handler.setLevel(logging.DEBUG)
+        logger.addHandler(file_handler)
 
     return logger
 
@@ -0,0 +1,159 @@
+"""Shared fixtures for tests that parse the sample PDFs.
+
+Stores, lookup caches and the log file written by tests live under pytest's
+temporary directories, which are separate per pytest-xdist worker, so the
+suite can run with ``pytest -n auto``.
+"""
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Tuple
+
+import pytest
+
+from src.core.extractors.citation_extractor import CitationExtractor
+from src.core.extractors.pdf_extractor import ExtractionResult, PDFExtractor
+from src.core.metadata.consolidator import MetadataConsolidator
+from src.core.metadata.models import Citation
+from src.processing import pipeline as pipeline_module
+from src.processing.academic import get_citation_extractor, get_equation_extractor
+from src.processing.pipeline import get_identifier_extractor, get_pdf_extractor, get_reference_extractor
+from src.utils import logger as logger_module
+
+TEST_PDFS_DIR = Path("tests/pdfs")
+
+
+class CachedPDFExtractor:
+    """Wrap a PDFExtractor so each PDF is parsed once per session.
+
+    Results are keyed by resolved path and modification time, so a file that
+    changes on disk is parsed again.
+    """
+
+    def __init__(self, extractor: PDFExtractor):
+        self.extractor = extractor
+        self._results: Dict[Tuple[Path, int], ExtractionResult] = {}
+
+    @staticmethod
+    def _key(file_path: Path) -> Tuple[Path, int]:
+        path = Path(file_path).resolve()
+        return path, path.stat().st_mtime_ns
+
+    def extract_all(self, file_path: Path) -> ExtractionResult:
+        """Return the extraction result for a PDF, parsing it on first use."""
+        key = self._key(file_path)
+        if key not in self._results:
+            self._results[key] = self.extractor.extract_all(file_path)
+        return self._results[key]
+
+    def get_file_hash(self, file_path: Path) -> str:
+        """Hash a PDF with the wrapped extractor."""
+        return self.extractor.get_file_hash(file_path)
+
+    def extract_batch(self, file_paths: List[Path]) -> List[ExtractionResult]:
+        """Return results for several PDFs, batch-parsing the ones not seen yet."""
+        keys = [self._key(file_path) for file_path in file_paths]
+        missing = [file_path for file_path, key in zip(file_paths, keys, strict=True) if key not in self._results]
+        # extract_batch hashes the next files in worker threads while marker renders
+        for file_path, result in zip(missing, self.extractor.extract_batch(missing), strict=True):
+            self._results[self._key(file_path)] = result
+        return [self._results[key] for key in keys]
+
+
+def _list_sample_pdfs() -> Tuple[Path, ...]:
+    """List the sample PDFs in tests/pdfs in a stable order."""
+    # scandir filters on the entry name without building a Path per directory entry
+    with os.scandir(TEST_PDFS_DIR) as entries:
+        return tuple(sorted(TEST_PDFS_DIR / entry.name for entry in entries if entry.name.endswith(".pdf")))
+
+
+# Listed at import so per-PDF tests are parametrized at collection time
+SAMPLE_PDFS = _list_sample_pdfs()
+
+
+def pytest_generate_tests(metafunc):
+    """Run tests taking a ``sample_pdf`` argument once per sample PDF.
+
+    Each PDF becomes its own test item, so one failure does not hide the rest
+    and ``pytest -n auto`` spreads the PDFs across workers.
+    """
+    if "sample_pdf" in metafunc.fixturenames:
+        metafunc.parametrize("sample_pdf", SAMPLE_PDFS, ids=lambda path: path.stem)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_storage(tmp_path_factory) -> Iterator[Path]:
+    """Point the shared extractors' lookup caches and the log file at a temporary directory.
+
+    Autouse session fixtures run before the others, so the extractor singletons
+    are built with these paths and nothing is written under storage/.
+    """
+    storage = tmp_path_factory.mktemp("storage")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(pipeline_module, "CROSSREF_CACHE_PATH", storage / "crossref_cache.sqlite")
+        mp.setattr(pipeline_module, "IDENTIFIER_CACHE_PATH", storage / "identifier_cache.sqlite")
+        mp.setattr(logger_module, "LOGS_DIR", storage / "logs")
+        logger_module.setup_logging()
+        yield storage
+
+
+@pytest.fixture(scope="session")
+def sample_pdfs() -> Tuple[Path, ...]:
+    """Sample PDFs in tests/pdfs, listed once per session in a stable order."""
+    return SAMPLE_PDFS
+
+
+@pytest.fixture(scope="session")
+def pdf_extractor() -> PDFExtractor:
+    """PDF extractor shared by the whole session and the pipeline (loads the marker models once)."""
+    return get_pdf_extractor()
+
+
+@pytest.fixture(scope="session")
+def cached_pdf_extractor(pdf_extractor) -> CachedPDFExtractor:
+    """PDF extractor that parses each file once per session."""
+    return CachedPDFExtractor(pdf_extractor)
+
+
+@pytest.fixture(scope="session")
+def citation_extractor() -> CitationExtractor:
+    """Citation extractor shared by the whole session and the pipeline."""
+    return get_citation_extractor()
+
+
+@pytest.fixture(scope="session")
+def extractors(cached_pdf_extractor, citation_extractor, tmp_path_factory) -> SimpleNamespace:
+    """Extractors and consolidator shared by the session, reusing the pipeline's instances.
+
+    The consolidator writes to a temporary store, one per pytest-xdist worker,
+    rather than the default store under storage/.
+    """
+    return SimpleNamespace(
+        pdf=cached_pdf_extractor,
+        identifier=get_identifier_extractor(),
+        reference=get_reference_extractor(),
+        equation=get_equation_extractor(),
+        citation=citation_extractor,
+        consolidator=MetadataConsolidator(store_path=tmp_path_factory.mktemp("store")),
+    )
+
+
+@pytest.fixture(scope="session")
+def pdf_contents(cached_pdf_extractor, sample_pdfs) -> Dict[Path, ExtractionResult]:
+    """Parse every sample PDF once per session, keyed by path.
+
+    Under pytest-xdist each worker process builds its own copy.
+    """
+    return dict(zip(sample_pdfs, cached_pdf_extractor.extract_batch(list(sample_pdfs)), strict=True))
+
+
+@pytest.fixture(scope="session")
+def citations_by_pdf(pdf_contents, citation_extractor) -> Dict[Path, List[Citation]]:
+    """Citations extracted from each sample PDF's text, keyed by path.
+
+    Linking mutates citations in place, so tests that link should work on copies.
+    """
+    return {
+        pdf_path: citation_extractor.extract_citations(content.text)
+        for pdf_path, content in pdf_contents.items()
+    }
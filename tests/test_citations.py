@@ -1,17 +1,15 @@
 """Test citation extraction and validation."""
 
-import json
-import shutil
+from collections import Counter
 from datetime import datetime
-from pathlib import Path
 from typing import List
 
+import orjson
 import pytest
 
-from src.core.extractors.citation_extractor import CitationExtractor
-from src.core.extractors.pdf_extractor import PDFExtractor
 from src.core.metadata.models import Author, Citation, Reference
-from src.utils.constants import PROCESSED_OUTPUT_PATH
+
+CITATION_TYPES = ("numeric", "author-year")
 
 
 def citation_to_dict(citation: Citation) -> dict:
@@ -27,19 +25,11 @@ def citation_to_dict(citation: Citation) -> dict:
 
 
 @pytest.fixture
-def output_dir():
-    """Create and return output directory for test results."""
-    path = PROCESSED_OUTPUT_PATH / "test_results"
-    # Clean previous results
-    if path.exists():
-        shutil.rmtree(path)
-
-    # Create directories
-    citations_dir = path / "citations"
-    marker_dir = path / "marker"
-    citations_dir.mkdir(parents=True)
-    marker_dir.mkdir(parents=True)
-
+def output_dir(tmp_path_factory):
+    """Create and return a fresh output directory for test results."""
+    path = tmp_path_factory.mktemp("test_results")
+    (path / "citations").mkdir()
+    (path / "marker").mkdir()
     return path
 
 
@@ -64,10 +54,8 @@ def sample_references() -> List[Reference]:
     ]
 
 
-def test_citation_types():
+def test_citation_types(citation_extractor):
     """Test different citation type detection."""
-    citation_extractor = CitationExtractor()
-
     # Test numeric citations
     numeric_text = "This is shown in [1] and also discussed in [2, 3]."
     numeric_citations = citation_extractor.extract_citations(numeric_text)
@@ -81,10 +69,8 @@ def test_citation_types():
     assert all(c.citation_type == "author-year" for c in author_year_citations)
 
 
-def test_citation_normalization():
+def test_citation_normalization(citation_extractor):
     """Test citation text normalization."""
-    citation_extractor = CitationExtractor()
-
     # Test numeric citations with various formats
     numeric_cases = [
         ("[1]", "1"),
@@ -121,10 +107,8 @@ def test_citation_normalization():
         )
 
 
-def test_citation_context():
+def test_citation_context(citation_extractor):
     """Test citation context extraction."""
-    citation_extractor = CitationExtractor()
-
     text = """This is a sentence before the citation.
     An important finding [1] was reported.
     This is a sentence after the citation."""
@@ -135,10 +119,8 @@ def test_citation_context():
     assert "was reported" in citations[0].context
 
 
-def test_reference_linking():
+def test_reference_linking(citation_extractor):
     """Test linking citations to references."""
-    citation_extractor = CitationExtractor()
-
     # Create test references
     references = [
         Reference(title="Test Paper", authors=[Author(full_name="Smith, J.")], year=2023, reference_id="ref_1")
@@ -154,41 +136,38 @@ def test_reference_linking():
     assert linked_citations[0].reference_id == "ref_1"
 
 
-def test_citation_extraction_with_validation(output_dir, sample_references):
+def test_citation_extraction_with_validation(
+    output_dir, sample_references, citation_extractor, pdf_contents, citations_by_pdf
+):
     """Test citation extraction with enhanced validation."""
-    pdf_extractor = PDFExtractor()
-    citation_extractor = CitationExtractor()
-    test_pdfs = list(Path("tests/pdfs").glob("*.pdf"))
-
-    assert len(test_pdfs) > 0, "No test PDFs found"
+    assert len(pdf_contents) > 0, "No test PDFs found"
+    run_timestamp = datetime.now().isoformat()
+    valid_ref_ids = frozenset(ref.reference_id for ref in sample_references)
 
     # Process each PDF
-    for pdf_path in test_pdfs:
+    for pdf_path, pdf_content in pdf_contents.items():
         print(f"\nProcessing: {pdf_path.name}")
 
-        # Extract text and markdown
-        pdf_content = pdf_extractor.extract_all(pdf_path)
-        text = pdf_content["text"]
-        markdown = pdf_content["markdown"]
+        # Text and markdown are parsed once per session
+        text = pdf_content.text
+        markdown = pdf_content.markdown
 
         # Save Marker output for comparison
         marker_dir = output_dir / "marker"
         marker_text = marker_dir / f"{pdf_path.stem}_text.txt"
         marker_md = marker_dir / f"{pdf_path.stem}_markdown.md"
 
-        with marker_text.open("w", encoding="utf-8") as f:
-            f.write(text)
-        with marker_md.open("w", encoding="utf-8") as f:
-            f.write(markdown)
+        marker_text.write_text(text, encoding="utf-8")
+        marker_md.write_text(markdown, encoding="utf-8")
 
-        # Extract and validate citations
-        citations = citation_extractor.extract_citations(text)
+        # Validate citations; copies keep linking from leaking into the shared fixture
+        citations = [citation.model_copy() for citation in citations_by_pdf[pdf_path]]
 
         # Validate citation format
         for citation in citations:
             assert citation.text, "Citation text cannot be empty"
             assert citation.context, "Citation must have context"
-            assert citation.citation_type in ["numeric", "author-year"], (
+            assert citation.citation_type in CITATION_TYPES, (
                 f"Invalid citation type: {citation.citation_type}"
             )
             assert citation.location, "Citation must have location information"
@@ -200,6 +179,7 @@ def test_citation_extraction_with_validation(output_dir, sample_references):
         unique_refs = citation_extractor.extract_unique_references(linked_citations)
 
         # Prepare results with validation info
+        type_counts = Counter(c.citation_type for c in citations)
         results = {
             "filename": pdf_path.name,
             "total_citations": len(citations),
@@ -207,56 +187,49 @@ def test_citation_extraction_with_validation(output_dir, sample_references):
             "citations": [citation_to_dict(c) for c in linked_citations],
             "unique_reference_ids": sorted(unique_refs),
             "validation": {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": run_timestamp,
                 "citation_format_valid": all(c.text and c.context for c in citations),
                 "reference_linking_valid": all(
-                    not c.reference_id or c.reference_id in {ref.reference_id for ref in sample_references}
-                    for c in linked_citations
+                    not c.reference_id or c.reference_id in valid_ref_ids for c in linked_citations
                 ),
-                "citation_types": {
-                    ctype: len([c for c in citations if c.citation_type == ctype])
-                    for ctype in ["numeric", "author-year"]
-                },
+                "citation_types": {ctype: type_counts[ctype] for ctype in CITATION_TYPES},
             },
         }
 
         # Save citation results
         citations_dir = output_dir / "citations"
         output_file = citations_dir / f"{pdf_path.stem}_citations.json"
-        with output_file.open("w", encoding="utf-8") as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        output_file.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
 
         # Save human-readable version with validation info
         readable_output = citations_dir / f"{pdf_path.stem}_citations.txt"
-        with readable_output.open("w", encoding="utf-8") as f:
-            f.write(f"Citations Analysis for {pdf_path.name}\n")
-            f.write("=" * 80 + "\n\n")
-            f.write(f"Total Citations Found: {len(citations)}\n")
-            f.write(f"Unique References: {len(unique_refs)}\n\n")
-
-            f.write("Validation Results:\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"Citation Format Valid: {results['validation']['citation_format_valid']}\n")
-            f.write(f"Reference Linking Valid: {results['validation']['reference_linking_valid']}\n")
-            f.write("\nCitation Types Distribution:\n")
-            for ctype, count in results["validation"]["citation_types"].items():
-                f.write(f"- {ctype}: {count}\n")
-            f.write("\n")
-
-            f.write("Citation Details:\n")
-            f.write("-" * 80 + "\n")
-            for i, citation in enumerate(linked_citations, 1):
-                f.write(f"\n{i}. Citation: {citation.text}\n")
-                f.write(f"   Type: {citation.citation_type}\n")
-                f.write(f"   Context: {citation.context}\n")
-                f.write(f"   Reference ID: {citation.reference_id or 'Not linked'}\n")
-                f.write(f"   Normalized: {citation.normalized_text}\n")
-                f.write("-" * 40 + "\n")
-
-            # Add reference list
-            f.write("\nUnique References:\n")
-            f.write("-" * 80 + "\n")
-            for ref in sorted(unique_refs):
-                f.write(f"- {ref}\n")
+        validation = results["validation"]
+        parts = [
+            f"Citations Analysis for {pdf_path.name}\n",
+            "=" * 80 + "\n\n",
+            f"Total Citations Found: {len(citations)}\n",
+            f"Unique References: {len(unique_refs)}\n\n",
+            "Validation Results:\n",
+            "-" * 80 + "\n",
+            f"Citation Format Valid: {validation['citation_format_valid']}\n",
+            f"Reference Linking Valid: {validation['reference_linking_valid']}\n",
+            "\nCitation Types Distribution:\n",
+        ]
+        parts.extend(f"- {ctype}: {count}\n" for ctype, count in validation["citation_types"].items())
+        parts.append("\nCitation Details:\n" + "-" * 80 + "\n")
+        parts.extend(
+            f"\n{i}. Citation: {citation.text}\n"
+            f"   Type: {citation.citation_type}\n"
+            f"   Context: {citation.context}\n"
+            f"   Reference ID: {citation.reference_id or 'Not linked'}\n"
+            f"   Normalized: {citation.normalized_text}\n"
+            + "-" * 40 + "\n"
+            for i, citation in enumerate(linked_citations, 1)
+        )
+
+        # Add reference list
+        parts.append("\nUnique References:\n" + "-" * 80 + "\n")
+        parts.extend(f"- {ref}\n" for ref in sorted(unique_refs))
+        readable_output.write_text("".join(parts), encoding="utf-8")
 
         print(f"Found {len(citations)} citations ({len(unique_refs)} unique references)")
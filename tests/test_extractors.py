@@ -1,16 +1,14 @@
 """Unit tests for extractors."""
-from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import orjson
 import pytest
 
 from src.core.extractors.equation_extractor import EquationExtractor
 from src.core.extractors.identifier_extractor import IdentifierExtractor
-from src.core.extractors.pdf_extractor import PDFExtractor
 from src.core.extractors.reference_extractor import ReferenceExtractor
 
 # Test data
-TEST_PDFS_DIR = Path("tests/pdfs")
 SAMPLE_DOI = "10.1234/sample.123"
 SAMPLE_ARXIV = "2301.12345"
 SAMPLE_TEXT = """
@@ -35,23 +33,20 @@ PV = nRT
 \\end{equation}
 """
 
-@pytest.fixture
-def pdf_file():
+@pytest.fixture(scope="session")
+def pdf_file(sample_pdfs):
     """Get first PDF from test directory."""
-    return next(TEST_PDFS_DIR.glob("*.pdf"))
+    return sample_pdfs[0]
 
-def test_pdf_extraction(pdf_file):
+def test_pdf_extraction(pdf_file, cached_pdf_extractor):
     """Test PDF text extraction."""
-    extractor = PDFExtractor()
-    results = extractor.extract_all(pdf_file)
+    results = cached_pdf_extractor.extract_all(pdf_file)
 
     assert results is not None
-    assert "text" in results
-    assert "markdown" in results
-    assert "file_hash" in results
-    assert len(results["text"]) > 0
-    assert len(results["markdown"]) > 0
-    assert len(results["file_hash"]) > 0
+    assert results.success
+    assert len(results.text) > 0
+    assert len(results.markdown) > 0
+    assert len(results.file_hash) > 0
 
 @patch('pdf2doi.pdf2doi')
 def test_identifier_extraction_doi(mock_pdf2doi, pdf_file):
@@ -62,7 +57,7 @@ def test_identifier_extraction_doi(mock_pdf2doi, pdf_file):
         'method': 'extraction'
     }
 
-    extractor = IdentifierExtractor()
+    extractor = IdentifierExtractor(cache_path=None)
     result = extractor.extract_identifier(pdf_file)
 
     assert result is not None
@@ -78,18 +73,42 @@ def test_identifier_extraction_arxiv(mock_pdf2doi, pdf_file):
         'method': 'extraction'
     }
 
-    extractor = IdentifierExtractor()
+    extractor = IdentifierExtractor(cache_path=None)
     result = extractor.extract_identifier(pdf_file)
 
     assert result is not None
     assert result["identifier"] == SAMPLE_ARXIV
     assert result["identifier_type"] == "arxiv"
 
-@patch('requests.get')
-def test_reference_extraction_crossref(mock_get):
+@patch('pdf2doi.pdf2doi')
+def test_identifier_extraction_cache(mock_pdf2doi, pdf_file, tmp_path):
+    """Test identifier lookups are served from the on-disk cache by file hash."""
+    mock_pdf2doi.return_value = {
+        'identifier': SAMPLE_DOI,
+        'identifier_type': 'doi',
+        'method': 'extraction'
+    }
+
+    cache_path = tmp_path / "identifier_cache.sqlite"
+    first = IdentifierExtractor(cache_path=cache_path).extract_identifier(pdf_file, "hash_1")
+    second = IdentifierExtractor(cache_path=cache_path).extract_identifier(pdf_file, "hash_1")
+
+    assert mock_pdf2doi.call_count == 1
+    assert second == first
+    assert second["identifier"] == SAMPLE_DOI
+
+    # PDFs without an identifier are cached as negative lookups
+    mock_pdf2doi.return_value = None
+    extractor = IdentifierExtractor(cache_path=cache_path)
+    assert extractor.extract_identifier(pdf_file, "hash_2") is None
+    assert extractor.extract_identifier(pdf_file, "hash_2") is None
+    assert mock_pdf2doi.call_count == 2
+
+@patch('requests.Session.get')
+def test_reference_extraction_crossref(mock_get, tmp_path):
     """Test reference extraction using Crossref."""
     mock_response = MagicMock()
-    mock_response.json.return_value = {
+    mock_response.content = orjson.dumps({
         "message": {
             "reference": [
                 {
@@ -99,10 +118,10 @@ def test_reference_extraction_crossref(mock_get):
                 }
             ]
         }
-    }
+    })
     mock_get.return_value = mock_response
 
-    extractor = ReferenceExtractor()
+    extractor = ReferenceExtractor(cache_path=tmp_path / "crossref_cache.sqlite")
     refs = extractor._extract_from_crossref(SAMPLE_DOI)
 
     assert len(refs) > 0
@@ -110,19 +129,112 @@ def test_reference_extraction_crossref(mock_get):
     assert len(refs[0].authors) > 0
     assert refs[0].year == 2023
 
+@patch('requests.Session.get')
+def test_reference_extraction_arxiv_doi(mock_get, tmp_path):
+    """Test arXiv IDs are looked up on Crossref via their 10.48550 DOI."""
+    mock_response = MagicMock()
+    mock_response.status_code = 404
+    mock_get.return_value = mock_response
+
+    extractor = ReferenceExtractor(cache_path=tmp_path / "crossref_cache.sqlite")
+    refs = extractor.extract_references(SAMPLE_ARXIV, "arxiv")
+
+    assert refs == []
+    assert mock_get.call_args.args[0].endswith(f"10.48550/arXiv.{SAMPLE_ARXIV}")
+
+@patch('requests.Session.get')
+def test_reference_extraction_crossref_batch(mock_get, tmp_path):
+    """Test batched Crossref lookups are demultiplexed per DOI."""
+    mock_response = MagicMock()
+    mock_response.content = orjson.dumps({
+        "message": {
+            "items": [
+                {
+                    "DOI": SAMPLE_DOI.upper(),
+                    "reference": [{"article-title": "Sample Paper", "author": "Author A", "year": "2023"}]
+                },
+                {"DOI": "10.1234/no.refs"}
+            ]
+        }
+    })
+    mock_get.return_value = mock_response
+
+    extractor = ReferenceExtractor(cache_path=tmp_path / "crossref_cache.sqlite")
+    results = extractor.extract_references_batch([
+        (SAMPLE_DOI, "doi"),
+        ("10.1234/no.refs", "doi"),
+        (SAMPLE_ARXIV, "arxiv")
+    ])
+
+    assert mock_get.call_count == 1
+    assert mock_get.call_args.kwargs["params"]["filter"] == "doi:10.1234/sample.123,doi:10.1234/no.refs"
+    assert mock_get.call_args.kwargs["params"]["select"] == "DOI,reference"
+    assert results[SAMPLE_DOI][0].title == "Sample Paper"
+    assert results["10.1234/no.refs"] == []
+    assert results[SAMPLE_ARXIV] == []
+
+@patch('requests.Session.get')
+def test_reference_extraction_crossref_cache(mock_get, tmp_path):
+    """Test Crossref lookups are served from the on-disk cache on repeat."""
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.content = orjson.dumps({
+        "message": {"reference": [{"article-title": "Sample Paper", "author": "Author A", "year": "2023"}]}
+    })
+    mock_get.return_value = mock_response
+
+    cache_path = tmp_path / "crossref_cache.sqlite"
+    first = ReferenceExtractor(cache_path=cache_path)._fetch_crossref_references(SAMPLE_DOI)
+    second = ReferenceExtractor(cache_path=cache_path)._fetch_crossref_references(SAMPLE_DOI.upper())
+
+    assert mock_get.call_count == 1
+    assert second == first
+    assert second[0]["article-title"] == "Sample Paper"
+
+    # Unknown DOIs are cached as negative lookups
+    mock_response.status_code = 404
+    extractor = ReferenceExtractor(cache_path=cache_path)
+    assert extractor._fetch_crossref_references("10.1234/missing") == []
+    assert extractor._fetch_crossref_references("10.1234/missing") == []
+    assert mock_get.call_count == 2
+
+def test_reference_author_separators():
+    """Test Crossref author strings are split on 'and', '&' and ';'."""
+    extractor = ReferenceExtractor(cache_path=None)
+    refs = extractor._parse_crossref_references([
+        {"article-title": "Sample Paper", "author": "Smith, J. and Doe, A.; Roe, B & Lee, C", "year": "2023"}
+    ])
+
+    assert [a.full_name for a in refs[0].authors] == ["Smith, J.", "Doe, A.", "Roe, B", "Lee, C"]
+
 def test_reference_extraction_text():
     """Test reference extraction from text."""
-    extractor = ReferenceExtractor()
+    extractor = ReferenceExtractor(cache_path=None)
     refs = extractor._extract_from_text(SAMPLE_TEXT)
 
     assert isinstance(refs, list)
     if extractor.anystyle_available:
         assert len(refs) > 0
 
-def test_equation_extraction():
+def test_reference_extraction_text_batch():
+    """Test batch reference extraction keeps results in input order."""
+    extractor = ReferenceExtractor(cache_path=None)
+    results = extractor.extract_references_batch_text([SAMPLE_TEXT, "No references here.", SAMPLE_TEXT], max_workers=2)
+
+    assert len(results) == 3
+    assert all(isinstance(refs, list) for refs in results)
+    assert results[1] == []
+    if extractor.anystyle_available:
+        assert len(results[0]) > 0
+
+@pytest.fixture(scope="module")
+def sample_equations():
+    """Equations extracted once from the sample markdown."""
+    return EquationExtractor().extract_equations(SAMPLE_MARKDOWN)
+
+def test_equation_extraction(sample_equations):
     """Test equation extraction."""
-    extractor = EquationExtractor()
-    equations = extractor.extract_equations(SAMPLE_MARKDOWN)
+    equations = sample_equations
 
     assert len(equations) == 3
 
@@ -135,12 +247,20 @@ def test_equation_extraction():
     # Check numbered equation
     assert any(eq.content == "PV = nRT" for eq in equations)
 
-def test_equation_context():
+def test_equation_context(sample_equations):
     """Test equation context extraction."""
-    extractor = EquationExtractor()
-    equations = extractor.extract_equations(SAMPLE_MARKDOWN)
-
-    for eq in equations:
+    for eq in sample_equations:
         assert eq.context
         assert isinstance(eq.context, str)
         assert len(eq.context) > 0
+
+def test_bracket_display_equation():
+    """Test \\[ ... \\] display math is extracted as one display equation, LaTeX commands included."""
+    markdown = "Energy is conserved:\n\\[\n\\frac{a}{b} = c\n\\]\nwhere $c$ is constant."
+    equations = EquationExtractor().extract_equations(markdown)
+
+    assert [(eq.content, eq.equation_type) for eq in equations] == [
+        ("\\frac{a}{b} = c", "display"),
+        ("c", "inline"),
+    ]
+    assert markdown[equations[0].location["start"]:equations[0].location["end"]] == "\\[\n\\frac{a}{b} = c\n\\]"
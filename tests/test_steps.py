@@ -0,0 +1,97 @@
+"""Unit tests for the processing step scheduler."""
+import asyncio
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import pytest
+
+from src.processing.steps import PipelineRunner, ProcessingStep
+from src.utils.constants import ProcessingState
+
+pytestmark = pytest.mark.asyncio  # Mark all tests as async
+
+
+class RecordingStep(ProcessingStep):
+    """Step that logs its start and finish, optionally failing or blocking."""
+
+    state = ProcessingState.PROCESSING
+
+    def __init__(
+        self,
+        name: str,
+        log: List[Tuple[str, str]],
+        requires: Tuple[str, ...] = (),
+        error: Optional[str] = None,
+        block: Optional[asyncio.Event] = None,
+    ):
+        self.name = name
+        self.label = name.title()
+        self.requires = requires
+        self.log = log
+        self.error = error
+        self.block = block
+        self.cancelled = False
+
+    async def run(self, context: Mapping[str, Any]) -> Dict[str, Any]:
+        self.log.append(("start", self.name))
+        try:
+            if self.block is not None:
+                await self.block.wait()
+            else:
+                await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise ValueError(self.error)
+        self.log.append(("finish", self.name))
+        return {self.name: True}
+
+
+async def test_dependency_ordering():
+    """Test each step starts only after its requirements finish, and independent steps overlap."""
+    log = []
+    steps = [
+        RecordingStep("storage", log, requires=("references", "equations")),
+        RecordingStep("references", log, requires=("text",)),
+        RecordingStep("equations", log, requires=("text",)),
+        RecordingStep("text", log),
+    ]
+
+    context = await PipelineRunner(steps).run({})
+
+    assert all(context[step.name] for step in steps)
+    assert context["state"] == ProcessingState.PROCESSING
+    position = {entry: i for i, entry in enumerate(log)}
+    for step in steps:
+        for required in step.requires:
+            assert position[("finish", required)] < position[("start", step.name)]
+    # Both dependents of "text" start before either finishes
+    assert position[("start", "equations")] < position[("finish", "references")]
+    assert position[("start", "references")] < position[("finish", "equations")]
+
+
+async def test_failure_cancels_running_steps():
+    """Test a failing step stops the run, cancels its siblings and skips dependents."""
+    log = []
+    blocked = RecordingStep("equations", log, block=asyncio.Event())
+    steps = [
+        RecordingStep("references", log, error="crossref down"),
+        blocked,
+        RecordingStep("storage", log, requires=("references", "equations")),
+    ]
+
+    context = await PipelineRunner(steps).run({})
+
+    assert context["state"] == ProcessingState.FAILED
+    assert context["errors"] == ["crossref down"]
+    # The sibling was cancelled and had unwound by the time run() returned
+    assert blocked.cancelled
+    assert ("start", "storage") not in log
+
+
+async def test_unsatisfiable_requirements():
+    """Test steps whose requirements can never be met are reported."""
+    steps = [RecordingStep("text", []), RecordingStep("storage", [], requires=("missing",))]
+
+    with pytest.raises(ValueError, match="Unsatisfiable step requirements: \\['storage'\\]"):
+        await PipelineRunner(steps).run({})
@@ -1,22 +1,23 @@
 """Unit tests for store and metadata components."""
 
-import shutil
+import os
 from pathlib import Path
+from types import MappingProxyType
 
 import numpy as np
+import orjson
 import pytest
 
 from src.core.metadata.consolidator import MetadataConsolidator
 from src.core.metadata.models import DocumentMetadata
 from src.core.store.lightrag import LightRAGStore
 from src.core.store.manager import StoreManager
-from src.utils.constants import DEFAULT_STORE_PATH
 
 pytestmark = pytest.mark.asyncio  # Mark all tests as async
 
 # Test data
-TEST_STORE_PATH = DEFAULT_STORE_PATH / "test_results" / "test_store"
-SAMPLE_METADATA = {
+# Read-only so no test can change the data the session-scoped model was built from
+SAMPLE_METADATA = MappingProxyType({
     "file_hash": "abc123",
     "identifier": "10.1234/sample",
     "identifier_type": "doi",
@@ -40,62 +41,72 @@ SAMPLE_METADATA = {
     "processing_status": "completed",
     "validated": True,
     "validation_errors": [],
-}
+})
 
+# Mock embeddings are sliced from one read-only FP32 pool instead of drawn per call
+EMBEDDING_DIM = 384
+EMBEDDING_POOL = np.random.default_rng(0).random((4096, EMBEDDING_DIM), dtype=np.float32)
+EMBEDDING_POOL.setflags(write=False)
 
-@pytest.fixture(scope="function")
+
+def mock_embedding_func(texts):
+    """Return one mock embedding per text without loading an embedding model."""
+    n = len(texts)
+    return EMBEDDING_POOL[:n] if n <= len(EMBEDDING_POOL) else np.resize(EMBEDDING_POOL, (n, EMBEDDING_DIM))
+
+
+mock_embedding_func.embedding_dim = EMBEDDING_DIM
+
+
+@pytest.fixture(scope="session")
 def test_file():
     """Create test file path."""
     return Path("test_doc.pdf")
 
 
-@pytest.fixture(scope="function")
-async def store_path():
-    """Create and clean test store path."""
-    path = TEST_STORE_PATH
-    if path.exists():
-        shutil.rmtree(path, ignore_errors=True)
-    path.mkdir(parents=True, exist_ok=True)
+@pytest.fixture(scope="session")
+def sample_metadata_model(test_file):
+    """Validate SAMPLE_METADATA once per session.
+
+    Tests must not modify the result; tests that do work on a model_copy(deep=True).
+    """
+    return DocumentMetadata(file_path=str(test_file), **SAMPLE_METADATA)
+
+
+@pytest.fixture(scope="session")
+def sample_metadata_dump(sample_metadata_model):
+    """Dump the sample model once per session; the store manager only reads it."""
+    return sample_metadata_model.model_dump()
+
 
-    # Create required subdirectories
-    (path / "lightrag" / "documents").mkdir(parents=True)
-    (path / "lightrag" / "vectors").mkdir(parents=True)
-    (path / "lightrag" / "metadata").mkdir(parents=True)
+@pytest.fixture(scope="function")
+async def store_path(tmp_path):
+    """Create a fresh test store path; pytest prunes old tmp_path directories.
 
-    yield path
-    if path.exists():
-        shutil.rmtree(path, ignore_errors=True)
+    The stores create their own subdirectories.
+    """
+    return tmp_path
 
 
 @pytest.fixture(scope="function")
 async def metadata_consolidator(store_path):
     """Create test metadata consolidator."""
-    consolidator = MetadataConsolidator(store_path=store_path)
-    # Initialize metadata file
-    consolidator._ensure_metadata_file()
-    return consolidator
+    # The constructor creates the metadata database
+    return MetadataConsolidator(store_path=store_path)
 
 
 @pytest.fixture(scope="function")
 async def lightrag_store(store_path):
     """Create test LightRAG store."""
-
-    # Mock embedding function
-    def mock_embedding_func(texts):
-        return np.random.rand(len(texts), 384)  # Return random embeddings
-
-    mock_embedding_func.embedding_dim = 384
-
-    return LightRAGStore(store_path=store_path, embedding_dim=384, embedding_func=mock_embedding_func)
+    return LightRAGStore(store_path=store_path, embedding_dim=EMBEDDING_DIM, embedding_func=mock_embedding_func)
 
 
 @pytest.fixture(scope="function")
 async def store_manager(store_path):
     """Create test store manager."""
-    manager = StoreManager(store_path=store_path)
-    # Initialize metadata file
-    manager.metadata_consolidator._ensure_metadata_file()
-    return manager
+    # The consolidator's constructor creates the metadata database; the mock
+    # embeddings keep the manager's LightRAG store from loading a model
+    return StoreManager(store_path=store_path, embedding_func=mock_embedding_func)
 
 
 async def test_metadata_consolidation(metadata_consolidator, test_file):
@@ -125,6 +136,37 @@ async def test_metadata_consolidation(metadata_consolidator, test_file):
     assert len(metadata.equations) == len(SAMPLE_METADATA["equations"])
     assert len(metadata.citations) == len(SAMPLE_METADATA["citations"])
     assert metadata.validated
+    assert metadata_consolidator.count_metadata() == 1
+
+
+async def test_reference_validation(metadata_consolidator, sample_metadata_model):
+    """Test references need a title or raw text, an author and an ID."""
+    metadata = sample_metadata_model.model_copy(deep=True)
+    assert metadata_consolidator._validate_references(metadata)
+
+    # A title alone no longer passes without authors
+    metadata.references[0].authors = []
+    assert not metadata_consolidator._validate_references(metadata)
+
+
+async def test_citation_consistency(sample_metadata_model):
+    """Test citations pointing at unknown references are reported."""
+    metadata = sample_metadata_model.model_copy(deep=True)
+    assert metadata.check_consistency() == []
+
+    metadata.citations[0].reference_id = "ref_2"
+    assert metadata.check_consistency() == ["Citation references non-existent reference ID: ref_2"]
+
+
+async def test_json_cache_not_copied(sample_metadata_model):
+    """Test copies of a model never reuse the source's cached JSON dump."""
+    sample_metadata_model.model_dump_json_cached()
+
+    for copied in (
+        sample_metadata_model.model_copy(update={"file_hash": "copied_hash"}),
+        sample_metadata_model.model_copy(update={"file_hash": "copied_hash"}, deep=True),
+    ):
+        assert orjson.loads(copied.model_dump_json_cached())["file_hash"] == "copied_hash"
 
 
 async def test_metadata_storage(metadata_consolidator, test_file):
@@ -148,23 +190,42 @@ async def test_metadata_storage(metadata_consolidator, test_file):
     assert metadata_consolidator.get_metadata(test_file) is None
 
 
-async def test_lightrag_store(lightrag_store):
+async def test_legacy_metadata_import(store_path, test_file, sample_metadata_dump):
+    """Test a pre-SQLite metadata.json is imported into a new store."""
+    document = sample_metadata_dump
+    legacy = {"schema_version": "1.0.0", "documents": {str(test_file): document}}
+    (store_path / "metadata.json").write_bytes(orjson.dumps(legacy))
+
+    consolidator = MetadataConsolidator(store_path=store_path)
+    imported = consolidator.get_metadata(test_file)
+
+    assert imported is not None
+    assert imported.file_hash == SAMPLE_METADATA["file_hash"]
+    assert str(test_file) in consolidator._load_metadata()["documents"]
+
+
+async def test_lightrag_store(lightrag_store, sample_metadata_model):
     """Test LightRAG store operations."""
-    # Create test metadata
-    metadata = DocumentMetadata(**SAMPLE_METADATA)
+    metadata = sample_metadata_model
 
     # Test document addition
     success = await lightrag_store.add_document_async(metadata)
     assert success
 
-    # Verify files were created
-    doc_path = lightrag_store.store_path / "documents" / f"{metadata.file_hash}.txt"
+    # Verify files were created; one directory listing per store directory instead of a stat per file
+    stored = {
+        entry.name
+        for subdir in ("documents", "metadata")
+        for entry in os.scandir(lightrag_store.store_path / subdir)
+    }
+    assert f"{metadata.file_hash}.txt" in stored
+    assert f"{metadata.file_hash}.json" in stored
+    assert lightrag_store.has_document(metadata.file_hash)
+    assert not lightrag_store.has_document("missing_hash")
+
+    # Memory-map the vector file to check its header without reading the data
     vec_path = lightrag_store.store_path / "vectors" / f"{metadata.file_hash}.npy"
-    meta_path = lightrag_store.store_path / "metadata" / f"{metadata.file_hash}.json"
-
-    assert doc_path.exists()
-    assert vec_path.exists()
-    assert meta_path.exists()
+    assert np.load(vec_path, mmap_mode="r", allow_pickle=False).shape == (EMBEDDING_DIM,)
 
     # Test search
     results = await lightrag_store.search_async("test query")
@@ -172,19 +233,37 @@ async def test_lightrag_store(lightrag_store):
     assert "matches" in results
 
 
-async def test_store_manager_operations(store_manager, test_file):
-    """Test store manager operations."""
-    # Create test metadata
-    metadata = DocumentMetadata(**SAMPLE_METADATA)
+async def test_lightrag_store_embedding_count_mismatch(store_path, sample_metadata_model):
+    """Test that a short embedding batch fails every document without writing any."""
+    store = LightRAGStore(
+        store_path=store_path, embedding_dim=EMBEDDING_DIM, embedding_func=lambda texts: EMBEDDING_POOL[:1]
+    )
+    documents = [sample_metadata_model.model_copy(update={"file_hash": f"hash_{i}"}) for i in range(2)]
 
+    assert await store.add_documents_async(documents) == [False, False]
+    assert not any(store.has_document(metadata.file_hash) for metadata in documents)
+    assert (await store.get_stats_async())["document_count"] == 0
+
+
+async def test_lightrag_store_embedding_backend_recorded(lightrag_store):
+    """Test that a store keeps the embedding backend it was first opened with."""
+    lightrag_store._check_embedding_backend("onnx")
+    lightrag_store._check_embedding_backend("onnx")
+
+    with pytest.raises(ValueError):
+        lightrag_store._check_embedding_backend("torch")
+
+
+async def test_store_manager_operations(store_manager, test_file, sample_metadata_dump):
+    """Test store manager operations."""
     # Add document
-    success = await store_manager.add_document_async(test_file, metadata.model_dump())
+    success = await store_manager.add_document_async(test_file, sample_metadata_dump)
     assert success
 
     # Get metadata
     stored_metadata = await store_manager.get_document_metadata_async(test_file)
     assert stored_metadata is not None
-    assert stored_metadata.file_hash == metadata.file_hash
+    assert stored_metadata.file_hash == sample_metadata_dump["file_hash"]
 
     # Get all metadata
     all_metadata = await store_manager.get_all_metadata_async()
@@ -195,7 +274,40 @@ async def test_store_manager_operations(store_manager, test_file):
     assert stats["document_count"] > 0
     assert "lightrag_stats" in stats
 
-    # Remove document
+    # Remove document; LightRAG holds it under the file hash, not the file name
+    file_hash = sample_metadata_dump["file_hash"]
+    assert store_manager.lightrag_store.has_document(file_hash)
+    assert stats["lightrag_stats"]["document_count"] == 1
     success = await store_manager.remove_document_async(test_file)
     assert success
     assert await store_manager.get_document_metadata_async(test_file) is None
+    assert not store_manager.lightrag_store.has_document(file_hash)
+    stats = await store_manager.get_store_stats_async()
+    assert stats["lightrag_stats"]["document_count"] == 0
+
+    # Removing it again leaves the count alone
+    assert await store_manager.remove_document_async(test_file)
+    assert await store_manager.lightrag_store.remove_document_async(file_hash)
+    stats = await store_manager.get_store_stats_async()
+    assert stats["lightrag_stats"]["document_count"] == 0
+
+
+async def test_store_manager_add_documents(store_manager, sample_metadata_model):
+    """Test adding several documents in one batch."""
+    # Copies with a new hash skip re-validating the sample data
+    documents = [
+        (
+            Path(f"test_doc_{i}.pdf"),
+            sample_metadata_model.model_copy(update={"file_path": f"test_doc_{i}.pdf", "file_hash": f"hash_{i}"})
+            .model_dump(),
+        )
+        for i in range(3)
+    ]
+
+    results = await store_manager.add_documents_async(documents)
+    assert results == [True, True, True]
+
+    for file_path, _ in documents:
+        assert await store_manager.get_document_metadata_async(file_path) is not None
+    stats = await store_manager.get_store_stats_async()
+    assert stats["lightrag_stats"]["document_count"] == 3